@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Header, Request, HTTPException, Response
 from pydantic import BaseModel, Field
 from app.services.auth_service import AuthService
+from app.services.token_service import TokenService
+from app.services.session_service import SessionService
 from app.utils.response_helper import StandardResponse, success_response, error_response
 from app.models.responses_models import LoginSuccessResponse, UserResponse
 from app.models.request_models import LoginData
-from app.utils.keycloak_config import keycloak_openid
+from app.utils.keycloak_config import keycloak_async
+from app.utils.response_route import ModelResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 @router.get(
     "/me",
@@ -33,13 +36,22 @@ async def get_current_user(request: Request):
 )
 async def login_user(data: LoginData, response: Response):
     try:
-        token = keycloak_openid.token(
+        token_response = await keycloak_async.token(
             username=data.email,
-            password=data.password,
-            grant_type="password"
-        )["access_token"]
+            password=data.password
+        )
+        token = token_response["access_token"]
+
+        # El token viene directo de Keycloak: sin introspección ni lectura extra de Firestore
+        user_data = await AuthService.user_from_issued_token(token)
 
-        user_data = await AuthService.verify_token(token)
+        max_age = 86400
+        if SessionService.enabled():
+            # El navegador solo recibe el id de sesión; los tokens quedan en el servidor.
+            # Cookie de sesión del navegador: la inactividad la controla el almacén
+            # (expiración deslizante), un max_age fijo la cortaría aunque haya actividad
+            token = await SessionService.create(token_response, user_data)
+            max_age = None
 
         response.set_cookie(
             key="authToken",
@@ -47,7 +59,7 @@ async def login_user(data: LoginData, response: Response):
             httponly=True,
             secure=False,
             samesite="Lax",
-            max_age=86400
+            max_age=max_age
         )
 
         return {
@@ -64,11 +76,16 @@ async def login_user(data: LoginData, response: Response):
 @router.post(
     "/logout",
     summary="Cerrar sesión",
-    description="Elimina la cookie de autenticación `authToken` para cerrar sesión de manera segura.",
+    description="Elimina la cookie de autenticación `authToken` y revoca el token para cerrar sesión de manera segura.",
     response_model=StandardResponse,
     status_code=200,
     tags=["Logout"]
 )
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    token = request.cookies.get("authToken")
+    if SessionService.is_session_id(token):
+        await SessionService.destroy(token)
+    elif token:
+        await TokenService.revoke(token)
     response.headers["Set-Cookie"] = "authToken=; Path=/; HttpOnly; Secure=False; SameSite=Lax; Max-Age=0"
     return success_response({"message": "Logout exitoso"})
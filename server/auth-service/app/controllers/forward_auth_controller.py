@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Request, Response, HTTPException
+from app.services.token_service import TokenService
+from app.services.session_service import SessionService
+from app.utils.response_helper import error_response
+from app.utils.response_route import ModelResponseRoute
+
+router = APIRouter(route_class=ModelResponseRoute)
+
+# Cabeceras de identidad que Traefik copia a la petición original (authResponseHeaders)
+USER_ID_HEADER    = "X-User-Id"
+USER_EMAIL_HEADER = "X-User-Email"
+USER_ROLE_HEADER  = "X-User-Role"
+
+# Ruta interna: Traefik la llama directo al contenedor y el router público
+# (/auth) la excluye. La respuesta nunca lleva el secreto del gateway, que
+# Traefik agrega por su cuenta a las peticiones hacia los servicios.
+INTERNAL_VERIFY_PATH = "/internal/verify"
+
+
+@router.get(
+    INTERNAL_VERIFY_PATH,
+    summary="Verificación ForwardAuth",
+    description=(
+        "Endpoint interno que Traefik consulta (ForwardAuth) una vez por petición. "
+        "Si la petición trae un token o id de sesión válido (cookie `authToken` o cabecera `Authorization`) "
+        "responde 200 con las cabeceras `X-User-Id`, `X-User-Email` y `X-User-Role`. "
+        "Sin token, o con una cookie que ya no se puede verificar, responde 200 sin identidad; "
+        "con una cabecera `Authorization` inválida responde 401."
+    ),
+    status_code=200,
+    tags=["Autenticación"]
+)
+async def verify(request: Request):
+    # Con root_path "/auth" la ruta también respondería a /auth/internal/verify
+    if request.scope["path"] != INTERNAL_VERIFY_PATH:
+        return Response(status_code=404)
+
+    token = request.cookies.get("authToken")
+    auth_header = request.headers.get("Authorization", "")
+    from_header = auth_header.startswith("Bearer ")
+    if from_header:
+        token = auth_header.split(" ", 1)[1]
+
+    if not token:
+        return Response(status_code=200)
+
+    if SessionService.is_session_id(token):
+        user = await SessionService.resolve(token)
+        if user is None:
+            if not from_header:
+                return Response(status_code=200)
+            return error_response("Sesión inválida o expirada", 401)
+    else:
+        try:
+            user = await TokenService.gateway_verdict(token)
+        except HTTPException as e:
+            # La cookie vive más que el access token: una cookie vencida no debe
+            # bloquear las rutas públicas, la petición sigue como anónima
+            if e.status_code == 401 and not from_header:
+                return Response(status_code=200)
+            return error_response(e.detail, e.status_code)
+
+    headers = {
+        USER_ID_HEADER: user["user_id"] or "",
+        USER_EMAIL_HEADER: user["email"] or "",
+        USER_ROLE_HEADER: user["role"],
+    }
+    return Response(status_code=200, headers=headers)
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends
 from app.services.auth_service import AuthService
 from app.utils.response_helper import success_response
 from app.models.responses_models import DashboardResponse, ClientResponse
+from app.utils.response_route import ModelResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 @router.get(
     "/dashboard",
@@ -1,15 +1,26 @@
+import csv
+import io
+import json
+import os
 import traceback
-from fastapi import APIRouter, UploadFile, File, Form
+from fastapi import APIRouter, UploadFile, File, Form, Depends
+from fastapi.responses import StreamingResponse
 from app.models.user_model import UserRegister
 from app.services.user_service import UserService
 from pydantic import EmailStr
 from typing import Optional
 from datetime import date, datetime
 from app.utils.response_helper import success_response, error_response
+from app.utils.registration_rules import validate_registration, build_user_data, coerce_row
+from app.services.auth_service import AuthService
 from app.models.responses_models import RegisterResponse
+from app.utils.response_route import ModelResponseRoute
 from fastapi import HTTPException
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
+
+# Filas máximas aceptadas por archivo en el registro masivo
+BULK_MAX_ROWS = int(os.getenv("BULK_REGISTER_MAX_ROWS", 5000))
 
 @router.post(
     "/register",
@@ -53,69 +64,32 @@ async def register_user(
     - **gym_logo**: Imagen opcional del logo del gimnasio
     """
     try:
-        # Validación de contraseñas
-        if len(password) < 8:
-            return error_response("La contraseña debe tener al menos 8 caracteres.", 400)
-
-        if not any(char.isdigit() for char in password):
-            return error_response("La contraseña debe contener al menos un número.", 400)
-
-        if not any(char.isupper() for char in password):
-            return error_response("La contraseña debe contener al menos una letra mayúscula.", 400)
-
-        if not any(char in "!@#$%^&*()-_+=" for char in password):
-            return error_response("La contraseña debe contener al menos un carácter especial (!@#$%^&*()-_+=).", 400)
-
-        if password != confirm_password:
-            return error_response("Las contraseñas no coinciden.", 400)
-
-        # Validación del tipo de usuario
-        if user_type not in ["gym_owner", "gym_member"]:
-            return error_response("El tipo de usuario debe ser 'gym_owner' o 'gym_member'.", 400)
- 
-        # Validación de campos obligatorios según el tipo de usuario
-        if user_type == "gym_owner":
-            if not gym_name:
-                return error_response("El nombre del gimnasio es obligatorio para dueños de gimnasio.", 400)
-            if not gym_address:
-                return error_response("La dirección del gimnasio es obligatoria para dueños de gimnasio.", 400)
-            if not gym_phone:
-                return error_response("El teléfono del gimnasio es obligatorio para dueños de gimnasio.", 400)
-            if not opening_hours:
-                return error_response("El horario de atención del gimnasio es obligatorio para dueños de gimnasio.", 400)
-            if not services_offered:
-                return error_response("Debe especificar al menos un servicio ofrecido por el gimnasio.", 400)
-            if capacity is not None and capacity <= 0:
-                return error_response("La capacidad del gimnasio debe ser un número positivo.", 400)
-
-        if user_type == "gym_member":
-            if not gym_id:
-                return error_response("El ID del gimnasio es obligatorio para miembros.", 400)
-            if not membership_number:
-                return error_response("El número de membresía es obligatorio para miembros.", 400)
-            if birth_date is None:
-                return error_response("La fecha de nacimiento es obligatoria para miembros.", 400)
-
-            # Validar que la persona tenga al menos 14 años para registrarse
-            from datetime import datetime
-            today = datetime.today().date()
-            age = (today - birth_date).days // 365
-            if age < 14:
-                return error_response("Debes tener al menos 14 años para registrarte.", 400)
-
-            if gender not in ["Masculino", "Femenino", "Otro"]:
-                return error_response("El género debe ser 'Masculino', 'Femenino' o 'Otro'.", 400)
-
-        # Validación del número de teléfono
-        import re
-        phone_pattern = r"^\+?[1-9]\d{7,14}$"  # Formato internacional
-        if not re.match(phone_pattern, phone):
-            return error_response("El número de teléfono no es válido. Debe contener entre 8 y 15 dígitos.", 400)
-
-        # Validación de redes sociales
-        if social_media:
-            if not social_media.startswith("http"):
-                return error_response("El enlace a redes sociales debe ser una URL válida.", 400)
+        fields = {
+            "full_name": full_name,
+            "email": email,
+            "password": password,
+            "confirm_password": confirm_password,
+            "phone": phone,
+            "user_type": user_type,
+            "gym_name": gym_name,
+            "gym_address": gym_address,
+            "gym_phone": gym_phone,
+            "opening_hours": opening_hours,
+            "services_offered": services_offered,
+            "capacity": capacity,
+            "social_media": social_media,
+            "gym_id": gym_id,
+            "membership_number": membership_number,
+            "birth_date": birth_date,
+            "gender": gender,
+            "training_goals": training_goals,
+            "activity_preferences": activity_preferences,
+        }
+
+        # Reglas de negocio compartidas con la carga masiva
+        error = validate_registration(fields)
+        if error:
+            return error_response(error, 400)
 
         # Validación de la imagen del gimnasio (opcional)
         if gym_logo:
@@ -126,37 +100,8 @@ async def register_user(
             if gym_logo.size > 100 * 1024 * 1024:  # 10MB máximo
                 return error_response("El logo del gimnasio no debe superar los 10MB.", 400)
 
-        # Procesar campos de lista
-        services_list = services_offered.split(",") if services_offered else []
-        training_goals_list = training_goals.split(",") if training_goals else []
-        activity_preferences_list = activity_preferences.split(",") if activity_preferences else []
-
         # Crear estructura de datos
-        user_data = {
-            "full_name": full_name,
-            "email": email,
-            "password": password,
-            "confirm_password": confirm_password,
-            "phone": phone,
-            "user_type": user_type,
-            "gym_info": {
-                "name": gym_name,
-                "address": gym_address,
-                "phone": gym_phone,
-                "opening_hours": opening_hours,
-                "services_offered": services_list,
-                "capacity": capacity,
-                "social_media": social_media,
-            } if user_type == "gym_owner" else None,
-            "member_info": {
-                "gym_id": gym_id,
-                "membership_number": membership_number,
-                "birth_date": birth_date,
-                "gender": gender,
-                "training_goals": training_goals_list,
-                "activity_preferences": activity_preferences_list,
-            } if user_type == "gym_member" else None,
-        }
+        user_data = build_user_data(fields)
 
         # Validar con modelo
         user = UserRegister(**user_data)
@@ -172,4 +117,93 @@ async def register_user(
     except Exception as e:
         print("Error durante el registro de usuario:")
         traceback.print_exc()
-        return error_response("Error interno en el servidor", 500)
\ No newline at end of file
+        return error_response("Error interno en el servidor", 500)
+
+
+def _parse_bulk_rows(content: bytes, is_csv: bool):
+    """
+    Devuelve pares `(n° de fila, dict | error)`. Una línea NDJSON mal formada
+    solo invalida esa fila.
+    """
+    text = content.decode("utf-8-sig")
+    if is_csv:
+        for n, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            yield n, row
+        return
+
+    for n, line in enumerate((l for l in text.splitlines() if l.strip()), start=1):
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            yield n, "La línea no es un JSON válido."
+            continue
+        yield n, row if isinstance(row, dict) else "La línea debe ser un objeto JSON."
+
+
+@router.post(
+    "/register/bulk",
+    summary="Registro masivo de usuarios",
+    description=(
+        "Registra muchos usuarios a partir de un archivo CSV (cabecera con los mismos nombres "
+        "de campo que `/register`) o NDJSON (un objeto por línea). Aplica las mismas validaciones "
+        "que `/register` y devuelve un resultado por fila en NDJSON a medida que se procesan, "
+        "seguido de un resumen. Se requiere el rol 'gym_owner'."
+    ),
+    tags=["Registro de Usuarios"]
+)
+async def register_users_bulk(
+    file: UploadFile = File(..., description="Archivo CSV o NDJSON con un usuario por fila"),
+    user: dict = Depends(AuthService.require_role("gym_owner"))
+):
+    content = await file.read()
+    is_csv = (file.filename or "").lower().endswith(".csv") or file.content_type == "text/csv"
+
+    try:
+        parsed = list(_parse_bulk_rows(content, is_csv))
+    except (UnicodeDecodeError, csv.Error):
+        return error_response("El archivo debe ser un CSV o NDJSON en UTF-8.", 400)
+
+    if len(parsed) > BULK_MAX_ROWS:
+        return error_response(f"El archivo supera el máximo de {BULK_MAX_ROWS} filas.", 400)
+
+    async def results():
+        created = failed = 0
+        valid = []
+
+        # Las filas inválidas se reportan de inmediato, sin tocar Keycloak
+        for n, row in parsed:
+            error = row if isinstance(row, str) else None
+            if error is None:
+                try:
+                    fields = coerce_row(row)
+                    error = validate_registration(fields)
+                    if not error:
+                        valid.append((n, UserRegister(**build_user_data(fields))))
+                except ValueError as e:
+                    error = str(e)
+                except Exception:
+                    # La respuesta ya empezó: un error de una fila no puede cortar el stream
+                    traceback.print_exc()
+                    error = "La fila no se pudo procesar."
+            if error:
+                failed += 1
+                yield json.dumps({"row": n, "success": False, "error": error}) + "\n"
+
+        pending = {n for n, _ in valid}
+        try:
+            async for result in UserService.register_users_bulk(valid):
+                pending.discard(result["row"])
+                if result["success"]:
+                    created += 1
+                else:
+                    failed += 1
+                yield json.dumps(result) + "\n"
+        except Exception:
+            traceback.print_exc()
+            for n in sorted(pending):
+                failed += 1
+                yield json.dumps({"row": n, "success": False, "error": "Error interno al registrar la fila."}) + "\n"
+
+        yield json.dumps({"summary": {"total": len(parsed), "created": created, "failed": failed}}) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
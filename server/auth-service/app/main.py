@@ -1,33 +1,61 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from app.controllers.register_controller import router as register_router
 from app.controllers.protected_controller import router as protected_router
 from app.controllers.auth_controller import router as auth_router
+from app.controllers.forward_auth_controller import router as forward_auth_router
 from app.middleware.auth_middleware import AuthMiddleware
 from app.middleware.rate_limit_middleware import RateLimitMiddleware
-from app.services.consul_service import register_service, deregister_service
+from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
+from app.middleware.compression_middleware import CompressionMiddleware
+from app.utils.consul_client import ConsulRegistration
+from app.utils.keycloak_config import keycloak_async
+from app.utils.firebase_config import init_firebase, open_channel
+from app.utils.startup import StartupOrchestrator
+from app.services.token_service import jwks_store, token_cache, verdict_cache, rejection_cache
+from app.services.session_service import session_store
 from contextlib import asynccontextmanager
 
-from app.config_loader import fetch_config, PROFILE
+from app.config_loader import fetch_config, PROFILE, on_config_change, start_config_watch
 
 cfg = fetch_config()
 # ahora vuelca cfg en variables de entorno o en tu pydantic BaseSettings
 HOST = cfg.get("host", "0.0.0.0")
 PORT = int(cfg.get("port", 8000))
 
+# Límites de tasa desde la configuración, recargables en caliente
+RateLimitMiddleware.configure(cfg)
+on_config_change(RateLimitMiddleware.configure)
+
+# Dependencias que se inicializan en paralelo al arrancar
+startup = StartupOrchestrator()
+startup.step("firebase", init_firebase)
+startup.step("keycloak", keycloak_async.connect)
+consul = ConsulRegistration("auth-service", PORT, tags=["auth", "fastapi", "v1", "env:dev"])
+startup.step("consul", consul.register, required=False)
+
+# Calentamiento en segundo plano: /ready se pone verde recién al terminar
+startup.warmup("jwks", jwks_store.refresh)
+startup.warmup("firestore", lambda: open_channel("users"))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    register_service()
+    start_config_watch()
+    await startup.run()
     yield
-    deregister_service()
+    await startup.close()
+    await consul.deregister()
+    await keycloak_async.aclose()
+    await session_store.close()
 
 def create_app(testing: bool = False) -> FastAPI:
     app = FastAPI(
         title="Autenticación y Registro - Plataforma EzTo",
         description="Microservicio para autenticación y registro de usuarios con FastAPI y Firebase...",
         version="1.0.0",
+        default_response_class=ORJSONResponse,
         root_path="/auth",
         contact={
             "name": "Equipo EzTo",
@@ -59,35 +87,14 @@ def create_app(testing: bool = False) -> FastAPI:
     # Rate Limiting
     app.add_middleware(RateLimitMiddleware)
 
-    # GZIP
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # Compresión de respuestas (zstd, brotli o gzip según Accept-Encoding, mínimo 1KB)
+    app.add_middleware(CompressionMiddleware, minimum_size=1000)
 
     if not testing:
         app.add_middleware(AuthMiddleware)
 
-    @app.middleware("http")
-    async def security_headers(request: Request, call_next):
-        response = await call_next(request)
-        response.headers.update({
-            "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",
-            "Content-Security-Policy": (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-                "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-                "img-src 'self' https://fastapi.tiangolo.com; "
-                "font-src 'self' https://cdnjs.cloudflare.com; "
-                "connect-src 'self'; "
-                "frame-ancestors 'self'; "
-                "form-action 'self'; "
-                "base-uri 'self';"
-            ),
-            "X-Content-Type-Options": "nosniff",
-            "X-Frame-Options": "DENY",
-            "X-XSS-Protection": "1; mode=block",
-            "Referrer-Policy": "strict-origin-when-cross-origin",
-            "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
-        })
-        return response
+    # Encabezados de seguridad
+    app.add_middleware(SecurityHeadersMiddleware)
 
     app.add_middleware(
         TrustedHostMiddleware,
@@ -97,17 +104,39 @@ def create_app(testing: bool = False) -> FastAPI:
     @app.get("/health", tags=["Monitoreo"])
     def health_check():
         return {"status": "ok"}
+
+    @app.get("/metrics/rate-limit", tags=["Monitoreo"])
+    def rate_limit_metrics():
+        return RateLimitMiddleware.metrics()
+
+    @app.get("/metrics/compression", tags=["Monitoreo"])
+    def compression_metrics():
+        return CompressionMiddleware.metrics()
+
+    @app.get("/metrics/token-cache", tags=["Monitoreo"])
+    def token_cache_metrics():
+        return {
+            "tokens": token_cache.stats(),
+            "verdicts": verdict_cache.stats(),
+            "rejections": rejection_cache.stats(),
+        }
+
+    @app.get("/ready", tags=["Monitoreo"])
+    def readiness_check():
+        # 200 solo cuando Firebase, Keycloak y Consul están inicializados y el servicio ya calentó
+        return JSONResponse(status_code=200 if startup.ready else 503, content=startup.status())
     
     @app.get("/config-health")
     def config_health():
         # Devuelve el profile y todo el cfg para inspección
-        return {"status": "up", "config_profile": PROFILE, "config": cfg}
+        return {"status": "up", "config_profile": PROFILE, "config": fetch_config()}
 
     # Routers
     app.include_router(register_router, tags=["Registro de Usuarios"])
     app.include_router(auth_router, tags=["Autenticación"])
     app.include_router(protected_router, tags=["Rutas Protegidas"])
     app.include_router(auth_router, tags=["Logout"])
+    app.include_router(forward_auth_router, tags=["Autenticación"])
 
     return app
 
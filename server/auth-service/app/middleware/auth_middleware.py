@@ -1,58 +1,95 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+import os
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from app.utils.keycloak_config import keycloak_openid
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.services.token_service import TokenService
+from app.services.session_service import SessionService
 import logging
 
 logger = logging.getLogger(__name__)
 
-EXCLUDED_PATHS = [
+EXCLUDED_PATHS = {
     "/auth/register", "/register",
     "/auth/login",    "/login",
     "/auth/logout",   "/logout",
     "/health",        "/auth/health",
-]
+    "/internal/verify",
+}
 
+# "local": verifica la firma contra las claves del realm en caché (por defecto)
+# "introspect": consulta a Keycloak en cada petición
+VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "local")
 
+# Rutas sensibles que siempre usan introspección (prefijos separados por comas)
+STRICT_PATHS = [p for p in os.getenv("AUTH_STRICT_PATHS", "").split(",") if p]
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path in EXCLUDED_PATHS:
-            return await call_next(request)
 
-        token = request.cookies.get("authToken")
+class AuthMiddleware:
+    """
+    Valida la cookie `authToken` (sesión opaca `sid_…` o JWT de Keycloak) y
+    deja el usuario en `request.state.user`.
 
-        if not token:
-            cookie_header = request.headers.get("Cookie", "")
-            if "authToken=" in cookie_header:
-                token = cookie_header.split("authToken=")[-1].split(";")[0]
+    Middleware ASGI puro: trabaja sobre `scope` y solo construye una
+    respuesta cuando tiene que devolver 401.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
+        token = self._token(scope)
         if not token:
-            return await call_next(request)  # Permitir acceso a rutas públicas
+            await self.app(scope, receive, send)  # Permitir acceso a rutas públicas
+            return
+
+        if SessionService.is_session_id(token):
+            user = await SessionService.resolve(token)
+            if user is None:
+                await self._unauthorized()(scope, receive, send)
+                return
+        else:
+            try:
+                if VERIFY_MODE == "introspect" or self._is_strict(scope["path"]):
+                    claims = await TokenService.introspect(token)
+                else:
+                    claims = await TokenService.verify_local(token)
+                user = TokenService.claims_to_user(claims)
+
+            except HTTPException as e:
+                logger.warning(f"Token inválido: {e.detail}")
+                await self._unauthorized()(scope, receive, send)
+                return
+
+        # Guardamos los datos del usuario para su uso posterior (request.state.user)
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
 
-        try:
-            token_info = keycloak_openid.introspect(token)
+    @staticmethod
+    def _token(scope: Scope):
+        cookie_header = Headers(scope=scope).get("cookie", "")
+        token = cookie_parser(cookie_header).get("authToken")
 
-            if not token_info.get("active"):
-                raise Exception("Token inactivo")
+        if not token and "authToken=" in cookie_header:
+            token = cookie_header.split("authToken=")[-1].split(";")[0]
+        return token
 
-            # Guardamos los datos del token para su uso posterior
-            request.state.user = {
-                "user_id": token_info.get("sub"),
-                "email": token_info.get("email"),
-                "username": token_info.get("preferred_username"),
-                "role": token_info.get("user_type", "gym_member")
+    @staticmethod
+    def _unauthorized() -> JSONResponse:
+        return JSONResponse(
+            status_code=401,
+            content={
+                "success": False,
+                "data": None,
+                "error": "Token inválido o expirado"
             }
+        )
 
-        except Exception as e:
-            logger.warning(f"Token inválido: {e}")
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "success": False,
-                    "data": None,
-                    "error": "Token inválido o expirado"
-                }
-            )
-
-        return await call_next(request)
+    @staticmethod
+    def _is_strict(path: str) -> bool:
+        return any(path.startswith(prefix) for prefix in STRICT_PATHS)
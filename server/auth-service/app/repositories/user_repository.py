@@ -1,76 +1,93 @@
 from fastapi import HTTPException
 from app.utils.firebase_config import db
-from app.utils.keycloak_config import keycloak_admin
+from app.utils.keycloak_config import keycloak_async
 from app.models.user_model import UserRegister
-from keycloak.exceptions import KeycloakPostError
+from app.utils.profile_cache import ProfileCache
+from keycloak.exceptions import KeycloakGetError, KeycloakPostError
 import asyncio
+import logging
+import os
 from datetime import date
+from typing import AsyncIterator, Awaitable, List, Optional, Tuple
+
+# Campos del perfil que necesita la autorización (proyección de Firestore)
+PROFILE_FIELDS = ["user_type"]
+
+logger = logging.getLogger(__name__)
+
+# Este servicio solo crea usuarios; los cambios de `user_type` hechos en otros
+# servicios se ven a lo sumo PROFILE_CACHE_TTL_SECONDS después
+profile_cache = ProfileCache(ttl_seconds=float(os.getenv("PROFILE_CACHE_TTL_SECONDS", 300)))
+
+# Representaciones de los roles del realm, por nombre
+_realm_roles: dict[str, dict] = {}
 
 class UserRepository:
 
     @staticmethod
-    async def create_user(user: UserRegister, logo_base64: str = None):
-        try:
-            # Paso 1: Verificar si ya existe el usuario en Keycloak
-            existing_users = keycloak_admin.get_users(query={"email": user.email})
-            if existing_users:
-                raise HTTPException(status_code=409, detail="Ya existe un usuario registrado con este correo.")
+    async def get_user_profile(user_id: str) -> Optional[dict]:
+        """
+        Devuelve los campos de autorización del usuario (`PROFILE_FIELDS`),
+        desde la caché o con una lectura proyectada a Firestore fuera del event loop.
+        Retorna None si el usuario no existe.
+        """
+        profile = profile_cache.get(user_id)
+        if profile is not None:
+            return profile
 
-            # Paso 2: Crear usuario en Keycloak
-            try:
-                user_id = keycloak_admin.create_user({
-                    "email": user.email,
-                    "username": user.email,
-                    "enabled": True,
-                    "firstName": user.full_name.strip().split(" ")[0],
-                    "lastName": " ".join(user.full_name.strip().split(" ")[1:]),
-                    "credentials": [{"value": user.password, "type": "password"}],
-                })
-
-                # Paso 2.1: Asignar rol al usuario
-                role_name = user.user_type  # "gym_owner" o "gym_member"
-                role = keycloak_admin.get_realm_role(role_name)
-                keycloak_admin.assign_realm_roles(user_id=user_id, roles=[role])
-
-            except KeycloakPostError as e:
-                if e.response_code == 409:
-                    raise HTTPException(status_code=409, detail="El usuario ya existe en Keycloak.")
-                else:
-                    raise HTTPException(status_code=502, detail=f"Error en Keycloak: {e}")
-            # Paso 3: Guardar en Firestore
-            user_data = user.dict()
-            user_data["uid"] = user_id
-            user_data["gym_logo_base64"] = logo_base64
-
-            if user_data.get("member_info"):
-                birth_date = user_data["member_info"].get("birth_date")
-                if isinstance(birth_date, date):
-                    user_data["member_info"]["birth_date"] = birth_date.isoformat()
-
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: db.collection("users").document(user_id).set(user_data)
-            )
+        loop = asyncio.get_running_loop()
+        user_doc = await loop.run_in_executor(
+            None,
+            lambda: db.collection("users").document(user_id).get(field_paths=PROFILE_FIELDS)
+        )
+        if not user_doc.exists:
+            return None
+
+        user_data = user_doc.to_dict() or {}
+        profile = {"user_type": user_data.get("user_type", "gym_member")}
+        profile_cache.set(user_id, profile)
+        return profile
+
+    @staticmethod
+    async def create_user(
+        user: UserRegister,
+        logo_base64: Optional[str] = None,
+        logo_task: Optional[Awaitable[str]] = None,
+    ):
+        """
+        Registro en etapas:
 
-            # Paso 4: Guardar datos del gimnasio si aplica
-            if user.user_type == "gym_owner" and user.gym_info:
-                gym_data = {
-                    "owner_id": user_id,
-                    "name": user.gym_info.name,
-                    "address": user.gym_info.address,
-                    "phone": user.gym_info.phone,
-                    "opening_hours": user.gym_info.opening_hours,
-                    "services_offered": user.gym_info.services_offered,
-                    "capacity": user.gym_info.capacity,
-                    "social_media": user.gym_info.social_media,
-                    "gym_logo_base64": logo_base64,
-                }
-
-                await loop.run_in_executor(
-                    None,
-                    lambda: db.collection("gyms").add(gym_data)
+        1. Comprobaciones previas en Keycloak (correo libre y rol del realm),
+           en paralelo con `logo_task`, que produce el logo ya codificado
+           (alternativa a pasar `logo_base64` directamente). El alta espera al
+           logo: una imagen inválida falla antes de tocar Keycloak.
+        2. Identidad en Keycloak (alta y rol).
+        3. Documentos `users` y `gyms` en un solo batch de Firestore.
+
+        Si la etapa 3 falla se elimina el usuario de Keycloak, así no quedan
+        cuentas sin perfil que bloqueen un nuevo intento con el mismo correo.
+        """
+        try:
+            if logo_task is not None:
+                results = await asyncio.gather(
+                    UserRepository._ensure_new_email(user.email),
+                    UserRepository._get_realm_role(user.user_type),
+                    logo_task,
+                    return_exceptions=True,
                 )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                logo_base64 = results[2]
+                user_id = await UserRepository._create_identity(user, check_existing=False)
+            else:
+                user_id = await UserRepository._create_identity(user)
+
+            try:
+                await UserRepository._save_documents(user, user_id, logo_base64)
+            except BaseException:
+                await UserRepository._delete_identity(user_id)
+                raise
 
             return {"message": "Usuario registrado exitosamente", "uid": user_id}
 
@@ -78,3 +95,161 @@ class UserRepository:
             raise http_exc  # Propaga errores personalizados correctamente
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error registrando el usuario: {str(e)}")
+
+    @staticmethod
+    async def _ensure_new_email(email: str):
+        existing_users = await keycloak_async.get_users(query={"email": email})
+        if existing_users:
+            raise HTTPException(status_code=409, detail="Ya existe un usuario registrado con este correo.")
+
+    @staticmethod
+    async def _create_identity(user: UserRegister, check_existing: bool = True) -> str:
+        # Paso 1: Verificar si ya existe el usuario en Keycloak
+        if check_existing:
+            await UserRepository._ensure_new_email(user.email)
+
+        # Paso 2: Resolver el rol ("gym_owner" o "gym_member") antes del alta. Está en
+        # caché, y si falla no queda en Keycloak un usuario creado a medias
+        role = await UserRepository._get_realm_role(user.user_type)
+
+        # Paso 2.1: Crear usuario en Keycloak
+        try:
+            user_id = await keycloak_async.create_user({
+                "email": user.email,
+                "username": user.email,
+                "enabled": True,
+                "firstName": user.full_name.strip().split(" ")[0],
+                "lastName": " ".join(user.full_name.strip().split(" ")[1:]),
+                "credentials": [{"value": user.password, "type": "password"}],
+            })
+        except KeycloakPostError as e:
+            if e.response_code == 409:
+                raise HTTPException(status_code=409, detail="El usuario ya existe en Keycloak.")
+            raise HTTPException(status_code=502, detail=f"Error en Keycloak: {e}")
+
+        # Paso 2.2: Asignar rol al usuario
+        try:
+            await keycloak_async.assign_realm_roles(user_id=user_id, roles=[role])
+        except Exception as e:
+            await UserRepository._delete_identity(user_id)
+            raise HTTPException(status_code=502, detail=f"Error en Keycloak: {e}")
+
+        return user_id
+
+    @staticmethod
+    async def _get_realm_role(role_name: str) -> dict:
+        # La representación de los roles del realm casi nunca cambia: se pide una vez
+        role = _realm_roles.get(role_name)
+        if role is None:
+            try:
+                role = await keycloak_async.get_realm_role(role_name)
+            except KeycloakGetError as e:
+                raise HTTPException(status_code=502, detail=f"Error en Keycloak: {e}")
+            _realm_roles[role_name] = role
+        return role
+
+    @staticmethod
+    async def _save_documents(user: UserRegister, user_id: str, logo_base64: Optional[str]):
+        batch = db.batch()
+        UserRepository._add_documents(batch, user, user_id, logo_base64)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, batch.commit)
+        profile_cache.set(user_id, {"user_type": user.user_type})
+
+    @staticmethod
+    def _add_documents(batch, user: UserRegister, user_id: str, logo_base64: Optional[str]):
+        # Paso 3: Guardar en Firestore
+        user_data = user.dict()
+        user_data["uid"] = user_id
+        user_data["gym_logo_base64"] = logo_base64
+
+        if user_data.get("member_info"):
+            birth_date = user_data["member_info"].get("birth_date")
+            if isinstance(birth_date, date):
+                user_data["member_info"]["birth_date"] = birth_date.isoformat()
+
+        batch.set(db.collection("users").document(user_id), user_data)
+
+        # Paso 4: Guardar datos del gimnasio si aplica, en el mismo batch
+        if user.user_type == "gym_owner" and user.gym_info:
+            batch.set(db.collection("gyms").document(), {
+                "owner_id": user_id,
+                "name": user.gym_info.name,
+                "address": user.gym_info.address,
+                "phone": user.gym_info.phone,
+                "opening_hours": user.gym_info.opening_hours,
+                "services_offered": user.gym_info.services_offered,
+                "capacity": user.gym_info.capacity,
+                "social_media": user.gym_info.social_media,
+                "gym_logo_base64": logo_base64,
+            })
+
+    @staticmethod
+    async def create_users_bulk(
+        rows: List[Tuple[int, UserRegister]],
+        concurrency: int = 10,
+        batch_size: int = 200,
+    ) -> AsyncIterator[dict]:
+        """
+        Registro masivo. Procesa las filas en bloques de `batch_size`:
+
+        - Las identidades de Keycloak de un bloque se crean con a lo sumo
+          `concurrency` llamadas simultáneas.
+        - Los documentos del bloque se escriben en un solo `WriteBatch`
+          (como máximo 2 escrituras por fila, bajo el límite de 500 de Firestore).
+        - Si el commit falla se eliminan de Keycloak todas las identidades del bloque.
+
+        Emite un resultado `{row, success, uid | error}` por fila a medida que
+        cada bloque termina.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def create_identity(user: UserRegister) -> str:
+            async with semaphore:
+                # Keycloak responde 409 si el correo ya existe: no hace falta consultarlo antes
+                return await UserRepository._create_identity(user, check_existing=False)
+
+        for start in range(0, len(rows), batch_size):
+            block = rows[start:start + batch_size]
+            identities = await asyncio.gather(
+                *(create_identity(user) for _, user in block),
+                return_exceptions=True,
+            )
+
+            created = []
+            for (row, user), identity in zip(block, identities):
+                if isinstance(identity, BaseException):
+                    detail = identity.detail if isinstance(identity, HTTPException) else str(identity)
+                    yield {"row": row, "success": False, "error": detail}
+                else:
+                    created.append((row, user, identity))
+
+            if not created:
+                continue
+
+            batch = db.batch()
+            for _, user, user_id in created:
+                UserRepository._add_documents(batch, user, user_id, None)
+
+            try:
+                await loop.run_in_executor(None, batch.commit)
+            except Exception as e:
+                logger.exception("Falló el batch de Firestore del registro masivo")
+                await asyncio.gather(*(UserRepository._delete_identity(uid) for _, _, uid in created))
+                for row, _, _ in created:
+                    yield {"row": row, "success": False, "error": f"Error guardando en la base de datos: {e}"}
+                continue
+
+            for row, user, user_id in created:
+                profile_cache.set(user_id, {"user_type": user.user_type})
+                yield {"row": row, "success": True, "uid": user_id}
+
+    @staticmethod
+    async def _delete_identity(user_id: str):
+        # Compensación: deshace el alta en Keycloak
+        try:
+            await keycloak_async.delete_user(user_id)
+        except Exception:
+            logger.exception("No pude eliminar el usuario %s de Keycloak tras un registro fallido", user_id)
@@ -1,6 +1,8 @@
 from fastapi import HTTPException, Request, Depends
-from app.utils.firebase_config import db
-from app.utils.keycloak_config import keycloak_openid
+from jose import jwt
+from app.repositories.user_repository import UserRepository
+from app.services.token_service import TokenService, token_cache, verdict_cache, revocation_list
+from app.services.session_service import SessionService
 
 class AuthService:
 
@@ -11,36 +13,12 @@ class AuthService:
             if not token:
                 raise HTTPException(status_code=401, detail="Token ausente o inválido")
 
-            try:
-                token_info = keycloak_openid.introspect(token)
-                if not token_info.get("active"):
-                    raise HTTPException(status_code=401, detail="Token inválido o expirado")
-            except Exception:
-                raise HTTPException(status_code=401, detail="Token inválido o expirado")
+            user = await AuthService.verify_token(token)
 
-            user_id = token_info.get("sub")
-            if not user_id:
-                raise HTTPException(status_code=401, detail="Token inválido (sin sub)")
-
-            try:
-                user_doc = db.collection("users").document(user_id).get()
-            except Exception:
-                raise HTTPException(status_code=500, detail="Error al acceder a la base de datos")
-
-            if not user_doc.exists:
-                raise HTTPException(status_code=404, detail="Usuario no encontrado en la base de datos")
-
-            user_data = user_doc.to_dict()
-            user_type = user_data.get("user_type", "gym_member")
-
-            if user_type != role:
+            if user["role"] != role:
                 raise HTTPException(status_code=403, detail="No autorizado para este recurso")
 
-            return {
-                "user_id": user_id,
-                "email": token_info.get("email", ""),
-                "role": user_type
-            }
+            return user
 
         return dependency
     
@@ -55,33 +33,63 @@ class AuthService:
 
     @staticmethod
     async def verify_token(token: str):
-        try:
-            token_info = keycloak_openid.introspect(token)
+        # En modo sesión la cookie trae un id opaco: la identidad está en el almacén
+        if SessionService.is_session_id(token):
+            user = await SessionService.resolve(token)
+            if user is None:
+                raise HTTPException(status_code=401, detail="Sesión inválida o expirada")
+            return user
+
+        # Un token ya verificado se sirve desde la caché hasta su expiración
+        cached = token_cache.get(token)
+        if cached is not None:
+            if not revocation_list.shared:
+                return cached
+            # Con almacén compartido, otro worker pudo revocar el token después de cachearlo
+            if await revocation_list.is_revoked(token):
+                token_cache.invalidate(token)
+                raise HTTPException(status_code=401, detail="Token revocado")
+            # Con el almacén caído no se confía en la caché: se introspecta
+            if not revocation_list.saturated():
+                return cached
+
+        token_info = await TokenService.introspect(token)
+
+        user = await AuthService._user_from_claims(token_info)
+        token_cache.set(token, user, token_info.get("exp"))
+        return user
 
-            if not token_info.get("active"):
-                raise HTTPException(status_code=401, detail="Token inválido o expirado")
-
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+    @staticmethod
+    async def user_from_issued_token(token: str):
+        """
+        Usuario de un token que Keycloak acaba de emitir en este mismo proceso
+        (login). Sus claims son confiables sin introspección ni verificación de
+        firma; el rol sale del perfil en caché. Deja el token en las cachés para
+        que las siguientes peticiones no repitan el trabajo.
+        """
+        claims = jwt.get_unverified_claims(token)
+        user = await AuthService._user_from_claims(claims)
+        token_cache.set(token, user, claims.get("exp"))
+        verdict_cache.set(token, user, claims.get("exp"))
+        return user
 
+    @staticmethod
+    async def _user_from_claims(token_info: dict):
         user_id = token_info.get("sub")
         if not user_id:
             raise HTTPException(status_code=401, detail="Token inválido (sin sub)")
 
         try:
-            user_doc = db.collection("users").document(user_id).get()
+            profile = await UserRepository.get_user_profile(user_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail="Error al acceder a la base de datos")
 
-        if not user_doc.exists:
+        if profile is None:
             raise HTTPException(status_code=404, detail="Usuario no encontrado en la base de datos")
 
-        user_data = user_doc.to_dict()
-        user_type = user_data.get("user_type", "gym_member")   
-                           
-        return {
+        user = {
             "user_id": user_id,
             "email": token_info.get("email", ""),
-            "role": user_type
+            "role": profile["user_type"]
         }
-                            
\ No newline at end of file
+        return user
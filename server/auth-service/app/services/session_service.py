@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+import secrets
+import time
+from typing import Optional
+
+from keycloak.exceptions import KeycloakAuthenticationError
+
+from app.utils.keycloak_config import keycloak_async
+from app.utils.session_store import create_session_store
+
+logger = logging.getLogger(__name__)
+
+# "token": la cookie `authToken` lleva el access token de Keycloak (por defecto)
+# "session": la cookie lleva un id de sesión opaco y los tokens quedan en el servidor
+SESSION_MODE = os.getenv("AUTH_SESSION_MODE", "token")
+
+# Inactividad máxima de una sesión; cada petición la renueva (expiración deslizante)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 1800))
+
+# Margen antes de la expiración del access token para refrescarlo en segundo plano
+REFRESH_MARGIN_SECONDS = int(os.getenv("SESSION_REFRESH_MARGIN_SECONDS", 60))
+
+# Los ids de sesión no contienen puntos, así nunca se confunden con un JWT
+SESSION_PREFIX = "sid_"
+
+session_store = create_session_store()
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+class SessionService:
+    """
+    Sesiones del lado del servidor.
+
+    El navegador solo recibe un id opaco; el access token, el refresh token y
+    la identidad ya resuelta del usuario quedan en el `session_store`. Resolver
+    una sesión es una lectura del almacén, sin criptografía ni llamadas a
+    Keycloak; el access token se renueva en segundo plano antes de expirar.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return SESSION_MODE == "session"
+
+    @staticmethod
+    def is_session_id(value: Optional[str]) -> bool:
+        return bool(value) and value.startswith(SESSION_PREFIX)
+
+    @staticmethod
+    async def create(token_response: dict, user: dict) -> str:
+        session_id = SESSION_PREFIX + secrets.token_urlsafe(32)
+        await session_store.set(
+            session_id,
+            SessionService._session_from_tokens(token_response, user),
+            SESSION_TTL_SECONDS,
+        )
+        return session_id
+
+    @staticmethod
+    async def resolve(session_id: str) -> Optional[dict]:
+        """
+        Devuelve el usuario de la sesión, o None si no existe o ya expiró.
+        """
+        session = await session_store.get(session_id, ttl=SESSION_TTL_SECONDS)
+        if session is None:
+            return None
+
+        now = time.time()
+        refresh_expires_at = session.get("refresh_expires_at")
+        if refresh_expires_at and refresh_expires_at <= now:
+            # Keycloak ya cerró la sesión: no hay forma de renovarla
+            await session_store.delete(session_id)
+            return None
+
+        if session["access_expires_at"] - now <= REFRESH_MARGIN_SECONDS:
+            SessionService._schedule_refresh(session_id, session)
+
+        return session["user"]
+
+    @staticmethod
+    async def destroy(session_id: str) -> None:
+        session = await session_store.get(session_id)
+        await session_store.delete(session_id)
+        if session and session.get("refresh_token"):
+            try:
+                await keycloak_async.logout(session["refresh_token"])
+            except Exception:
+                logger.warning("No pude cerrar la sesión en Keycloak")
+
+    @staticmethod
+    def _session_from_tokens(token_response: dict, user: dict) -> dict:
+        now = time.time()
+        refresh_expires_in = token_response.get("refresh_expires_in", 0)
+        return {
+            "user": user,
+            "access_token": token_response["access_token"],
+            "refresh_token": token_response.get("refresh_token"),
+            "access_expires_at": now + token_response.get("expires_in", 300),
+            # 0 indica un refresh token sin expiración (offline)
+            "refresh_expires_at": now + refresh_expires_in if refresh_expires_in else None,
+        }
+
+    @staticmethod
+    def _schedule_refresh(session_id: str, session: dict) -> None:
+        # Single-flight por sesión: ráfagas de peticiones disparan un solo refresh
+        task = _refreshing.get(session_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.get_running_loop().create_task(
+            SessionService._refresh(session_id, session)
+        )
+        _refreshing[session_id] = task
+        task.add_done_callback(lambda _: _refreshing.pop(session_id, None))
+
+    @staticmethod
+    async def _refresh(session_id: str, session: dict) -> None:
+        if not session.get("refresh_token"):
+            return
+        try:
+            token_response = await keycloak_async.refresh_token(session["refresh_token"])
+        except KeycloakAuthenticationError:
+            logger.info("Refresh token rechazado, cierro la sesión")
+            await session_store.delete(session_id)
+            return
+        except Exception:
+            # Keycloak no disponible: se reintenta en la próxima petición
+            logger.warning("No pude refrescar el token de la sesión")
+            return
+
+        await session_store.set(
+            session_id,
+            SessionService._session_from_tokens(token_response, session["user"]),
+            SESSION_TTL_SECONDS,
+        )
@@ -0,0 +1,145 @@
+import os
+import logging
+from fastapi import HTTPException
+from jose import jwt, JWTError
+
+from app.utils.keycloak_config import keycloak_async, server_url, realm
+from app.utils.jwks_cache import JWKSKeyStore
+from app.utils.token_revocation import RevocationList
+from app.utils.token_cache import TokenCache
+from app.services.session_service import session_store
+
+logger = logging.getLogger(__name__)
+
+ISSUER   = f"{server_url}/realms/{realm}"
+JWKS_URL = f"{ISSUER}/protocol/openid-connect/certs"
+
+# Claves del realm, lista de logouts y tokens ya resueltos, compartidos por todo el proceso
+jwks_store = JWKSKeyStore(JWKS_URL, ttl_seconds=float(os.getenv("JWKS_TTL_SECONDS", 600)))
+# Con un almacén compartido (Redis) un logout vale para todos los workers y réplicas
+revocation_list = RevocationList(store=session_store if session_store.shared else None)
+token_cache = TokenCache(
+    max_entries=int(os.getenv("TOKEN_CACHE_SIZE", 10000)),
+    ttl_seconds=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300)),
+)
+
+# Veredictos del endpoint ForwardAuth: aceptados hasta su exp, rechazados por poco tiempo
+verdict_cache = TokenCache(
+    max_entries=int(os.getenv("VERDICT_CACHE_SIZE", 50000)),
+    ttl_seconds=float(os.getenv("VERDICT_CACHE_TTL_SECONDS", 300)),
+)
+rejection_cache = TokenCache(max_entries=10000, ttl_seconds=30)
+
+
+class TokenService:
+    """
+    Verificación de tokens de Keycloak.
+
+    - `verify_local`: valida la firma RS256 contra las claves del realm en caché,
+      sin ir a Keycloak. Es el modo por defecto.
+    - `introspect`: pregunta a Keycloak si el token sigue activo. Es el modo
+      estricto, pensado para rutas sensibles.
+    """
+
+    @staticmethod
+    async def verify_local(token: str) -> dict:
+        if await revocation_list.is_revoked(token):
+            raise HTTPException(status_code=401, detail="Token revocado")
+        if revocation_list.saturated():
+            # Hay revocaciones vigentes que no entraron en la lista: decide Keycloak
+            return await TokenService.introspect(token)
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+
+        try:
+            key = await jwks_store.get_key(kid)
+        except Exception:
+            logger.exception("No pude descargar JWKS")
+            raise HTTPException(status_code=500, detail="Error en el backend de autenticación")
+        if not key:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+
+        try:
+            return jwt.decode(
+                token,
+                key=key,
+                algorithms=["RS256"],
+                issuer=ISSUER,
+                options={"verify_aud": False}
+            )
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+
+    @staticmethod
+    async def introspect(token: str) -> dict:
+        if await revocation_list.is_revoked(token):
+            raise HTTPException(status_code=401, detail="Token revocado")
+
+        try:
+            token_info = await keycloak_async.introspect(token)
+        except Exception:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+
+        if not token_info.get("active"):
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+        return token_info
+
+    @staticmethod
+    def claims_to_user(claims: dict) -> dict:
+        roles = claims.get("realm_access", {}).get("roles", [])
+        role = claims.get("user_type") or ("gym_owner" if "gym_owner" in roles else "gym_member")
+        return {
+            "user_id": claims.get("sub"),
+            "email": claims.get("email"),
+            "username": claims.get("preferred_username"),
+            "role": role
+        }
+
+    @staticmethod
+    async def gateway_verdict(token: str) -> dict:
+        """
+        Veredicto para el gateway: identidad del usuario o HTTPException(401).
+        Los veredictos se cachean para que un mismo token no repita la criptografía.
+        """
+        user = verdict_cache.get(token)
+        if user is not None:
+            if not revocation_list.shared:
+                return user
+            # Con almacén compartido, otro worker pudo revocar el token después de cachearlo
+            if await revocation_list.is_revoked(token):
+                verdict_cache.invalidate(token)
+                raise HTTPException(status_code=401, detail="Token revocado")
+            if not revocation_list.saturated():
+                return user
+            # Almacén caído: el veredicto cacheado no basta, decide verify_local (Keycloak)
+        if rejection_cache.get(token) is not None:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+
+        try:
+            claims = await TokenService.verify_local(token)
+        except HTTPException as e:
+            if e.status_code == 401:
+                rejection_cache.set(token, {})
+            raise
+
+        user = TokenService.claims_to_user(claims)
+        verdict_cache.set(token, user, claims.get("exp"))
+        return user
+
+    @staticmethod
+    async def revoke(token: str) -> None:
+        token_cache.invalidate(token)
+        verdict_cache.invalidate(token)
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            return
+        await revocation_list.revoke(token, exp)
+        # También en Keycloak, para que la introspección lo rechace en cualquier proceso
+        try:
+            await keycloak_async.revoke(token)
+        except Exception:
+            logger.warning("No pude revocar el token en Keycloak")
@@ -1,10 +1,15 @@
 from app.models.user_model import UserRegister
 from app.repositories.user_repository import UserRepository
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
+import asyncio
 import base64
-from PIL import Image
+import os
 import io
 
+# Llamadas simultáneas a Keycloak y filas por WriteBatch en el registro masivo
+BULK_CONCURRENCY = int(os.getenv("BULK_REGISTER_CONCURRENCY", 10))
+BULK_BATCH_SIZE = int(os.getenv("BULK_REGISTER_BATCH_SIZE", 200))
+
 class UserService:
 
     @staticmethod
@@ -13,34 +18,47 @@ class UserService:
         if user.password != user.confirm_password:
             raise Exception("Las contraseñas no coinciden.")
         
-        # Convertir la imagen a Base64 comprimida en formato WebP si se proporciona un logo
-        logo_base64 = None
-        if gym_logo:
-            try:
-                # Leer el archivo subido
-                content = await gym_logo.read()
-                
-                # Abrir la imagen con PIL y redimensionarla (por ejemplo, a 300x300)
-                image = Image.open(io.BytesIO(content))
-                image = image.convert("RGB")  # Asegurar formato correcto para WebP
-                image.thumbnail((800, 800))   # Redimensionar la imagen
-                
-                # Guardar la imagen comprimida en un buffer como WebP
-                buffer = io.BytesIO()
-                image.save(buffer, format="WEBP", quality=70)  # Formato WebP con calidad 70%
-                compressed_content = buffer.getvalue()
-                
-                # Convertir la imagen comprimida a Base64
-                logo_base64 = base64.b64encode(compressed_content).decode('utf-8')
-                
-            except Exception as e:
-                raise Exception(f"Error al procesar la imagen: {str(e)}")
-
         # Validar tipo de usuario
         if user.user_type == "gym_owner" and not user.gym_info:
             raise Exception("La información del gimnasio es requerida para dueños de gimnasio.")
         if user.user_type == "gym_member" and not user.member_info:
             raise Exception("La información del miembro es requerida para miembros de gimnasio.")
 
+        # Convertir la imagen a Base64 comprimida en formato WebP si se proporciona un logo.
+        # El procesamiento corre en un hilo mientras el repositorio consulta Keycloak.
+        logo_task = None
+        if gym_logo:
+            content = await gym_logo.read()
+            loop = asyncio.get_running_loop()
+            logo_task = loop.run_in_executor(None, UserService._compress_logo, content)
+
         # Crear usuario en Firebase y guardar en Firestore
-        return await UserRepository.create_user(user, logo_base64)
+        return await UserRepository.create_user(user, logo_task=logo_task)
+
+    @staticmethod
+    def register_users_bulk(rows: list):
+        # Generador asíncrono de resultados por fila
+        return UserRepository.create_users_bulk(
+            rows, concurrency=BULK_CONCURRENCY, batch_size=BULK_BATCH_SIZE
+        )
+
+    @staticmethod
+    def _compress_logo(content: bytes) -> str:
+        # PIL solo se carga si alguien sube un logo: no pesa en el arranque
+        from PIL import Image
+
+        try:
+            # Abrir la imagen con PIL y redimensionarla
+            image = Image.open(io.BytesIO(content))
+            image = image.convert("RGB")  # Asegurar formato correcto para WebP
+            image.thumbnail((800, 800))   # Redimensionar la imagen
+
+            # Guardar la imagen comprimida en un buffer como WebP
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=70)  # Formato WebP con calidad 70%
+
+            # Convertir la imagen comprimida a Base64
+            return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error al procesar la imagen: {str(e)}")
@@ -0,0 +1,228 @@
+# app/utils/consul_client.py
+import asyncio
+import itertools
+import logging
+import os
+import socket
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CONSUL_ADDR = os.getenv("CONSUL_ADDR", "http://consul:8500").rstrip("/")
+# Espera máxima de cada blocking query de Consul
+DISCOVERY_WAIT = os.getenv("CONSUL_DISCOVERY_WAIT", "30s")
+# Cuánto esperar la primera lista de instancias antes de usar la URL de respaldo
+DISCOVERY_FIRST_TIMEOUT = float(os.getenv("CONSUL_DISCOVERY_FIRST_TIMEOUT", 2))
+
+
+def get_local_ip() -> str:
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return "127.0.0.1"
+
+
+class ConsulRegistration:
+    """
+    Registro del servicio en el agente de Consul, sin bloquear el arranque.
+
+    - `register()` intenta una vez; si Consul no responde, sigue reintentando
+      en segundo plano con backoff exponencial y el servicio arranca igual.
+    - El ID es `nombre-hostname`: estable por contenedor, así un reinicio
+      reemplaza su propio registro y varias réplicas no se pisan.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        port: int,
+        tags: Optional[list] = None,
+        meta: Optional[dict] = None,
+        check_path: str = "/health",
+        max_backoff: float = 60,
+    ):
+        self.service_name = service_name
+        self.port = port
+        self.service_id = f"{service_name}-{socket.gethostname()}"
+        self.tags = tags or ["fastapi", "v1", "env:dev"]
+        self.meta = meta or {"version": "1.0.0", "maintainer": "infra@eztoplatform.com"}
+        self.check_path = check_path
+        self.max_backoff = max_backoff
+        self.registered = False
+        self._retry_task: Optional[asyncio.Task] = None
+
+    def _payload(self) -> dict:
+        address = get_local_ip()
+        return {
+            "ID": self.service_id,
+            "Name": self.service_name,
+            "Address": address,
+            "Port": self.port,
+            "Tags": self.tags,
+            "Meta": self.meta,
+            "Check": {
+                "HTTP": f"http://{address}:{self.port}{self.check_path}",
+                "Interval": "10s",
+                "Timeout": "3s",
+                "DeregisterCriticalServiceAfter": "1m",
+            },
+        }
+
+    async def _put(self, path: str, payload: Optional[dict] = None) -> None:
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.put(f"{CONSUL_ADDR}/v1/agent/service/{path}", json=payload)
+            response.raise_for_status()
+
+    async def register(self) -> bool:
+        try:
+            await self._put("register", self._payload())
+        except Exception as e:
+            logger.warning("No pude registrar '%s' en Consul (%r), reintento en segundo plano", self.service_id, e)
+            if self._retry_task is None or self._retry_task.done():
+                self._retry_task = asyncio.get_running_loop().create_task(self._retry())
+            return False
+        self.registered = True
+        logger.info("Servicio '%s' registrado en Consul", self.service_id)
+        return True
+
+    async def _retry(self) -> None:
+        backoff = 1.0
+        while not self.registered:
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+            try:
+                await self._put("register", self._payload())
+                self.registered = True
+                logger.info("Servicio '%s' registrado en Consul", self.service_id)
+            except Exception as e:
+                logger.warning("Reintento de registro en Consul falló (%r), próximo en %.0f s", e, backoff)
+
+    async def deregister(self) -> None:
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+        if not self.registered:
+            return
+        try:
+            await self._put(f"deregister/{self.service_id}")
+            self.registered = False
+            logger.info("Servicio '%s' desregistrado de Consul", self.service_id)
+        except Exception as e:
+            logger.warning("No pude desregistrar '%s' de Consul: %r", self.service_id, e)
+
+
+class ServiceDiscovery:
+    """
+    Descubrimiento de servicios vía Consul con caché local de instancias sanas.
+
+    - Por cada servicio que se consulta se arranca un watcher con blocking
+      queries (`?index=…&wait=…`) a `/v1/health/service/<nombre>?passing`:
+      la lista se actualiza apenas cambia en Consul, sin polling.
+    - Las llamadas se reparten round-robin entre las instancias sanas y, ante
+      un error de conexión, se reintenta en la siguiente.
+    - Si Consul cae se sigue usando la última lista conocida; si nunca hubo
+      lista se usa la URL de respaldo (`fallback`, normalmente la de la env).
+    """
+
+    def __init__(self, consul_addr: str = CONSUL_ADDR, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.consul_addr = consul_addr
+        self._transport = transport
+        self._instances: dict[str, list[str]] = {}
+        self._loaded: dict[str, asyncio.Event] = {}
+        self._watchers: dict[str, asyncio.Task] = {}
+        self._round_robin: dict[str, itertools.count] = {}
+        self._consul: Optional[httpx.AsyncClient] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _clients(self):
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=5,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                transport=self._transport,
+            )
+            # Las blocking queries quedan abiertas hasta `wait`; van por su propio cliente
+            self._consul = httpx.AsyncClient(timeout=None, transport=self._transport)
+        return self._consul, self._http
+
+    async def instances(self, service: str) -> list:
+        """
+        URLs base (`http://ip:puerto`) de las instancias sanas de `service`.
+        """
+        if service not in self._watchers:
+            self._loaded[service] = asyncio.Event()
+            self._round_robin[service] = itertools.count()
+            self._watchers[service] = asyncio.get_running_loop().create_task(self._watch(service))
+        loaded = self._loaded[service]
+        if not loaded.is_set():
+            try:
+                await asyncio.wait_for(loaded.wait(), DISCOVERY_FIRST_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+        return self._instances.get(service, [])
+
+    async def request(self, service: str, method: str, path: str, fallback: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        Hace `method path` contra una instancia sana de `service`.
+        """
+        urls = await self.instances(service) or ([fallback.rstrip("/")] if fallback else [])
+        if not urls:
+            raise httpx.ConnectError(f"No hay instancias sanas de '{service}'")
+
+        _, http = self._clients()
+        start = next(self._round_robin[service])
+        last_error = None
+        for i in range(len(urls)):
+            base = urls[(start + i) % len(urls)]
+            try:
+                return await http.request(method, f"{base}{path}", **kwargs)
+            except httpx.TransportError as e:
+                logger.warning("Instancia %s de '%s' no responde: %r", base, service, e)
+                last_error = e
+        raise last_error
+
+    async def _watch(self, service: str) -> None:
+        index = "0"
+        backoff = 1.0
+        while True:
+            consul, _ = self._clients()
+            try:
+                response = await consul.get(
+                    f"{self.consul_addr}/v1/health/service/{service}",
+                    params={"passing": "true", "index": index, "wait": DISCOVERY_WAIT},
+                )
+                response.raise_for_status()
+                new_index = response.headers.get("X-Consul-Index", "0")
+                # Si el índice retrocede (reinicio de Consul) se vuelve a empezar
+                index = new_index if int(new_index) >= int(index) else "0"
+
+                urls = []
+                for entry in response.json():
+                    address = entry["Service"].get("Address") or entry["Node"]["Address"]
+                    urls.append(f"http://{address}:{entry['Service']['Port']}")
+                if urls != self._instances.get(service):
+                    logger.info("Instancias de '%s': %s", service, urls)
+                self._instances[service] = urls
+                self._loaded[service].set()
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Discovery de '%s' falló (%r), reintento en %.0f s", service, e, backoff)
+                # Sin respuesta de Consul: que las llamadas usen la lista previa o el respaldo
+                self._loaded[service].set()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def close(self) -> None:
+        for task in self._watchers.values():
+            task.cancel()
+        self._watchers.clear()
+        for client in (self._consul, self._http):
+            if client is not None:
+                await client.aclose()
+
+
+# Cliente compartido por todo el proceso
+discovery = ServiceDiscovery()
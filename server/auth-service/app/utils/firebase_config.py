@@ -1,54 +1,69 @@
 # app/utils/firebase_config.py
 
+import threading
+
 import firebase_admin
 from firebase_admin import credentials, firestore
-from app.config_loader import fetch_config, decrypt_value
+from app.config_loader import fetch_config
 
-# 1) Baja la sección “firebase”
-cfg = fetch_config().get("firebase", {})
-
-# Función de debug para imprimir los valores recibidos
-def _maybe_decrypt(val: str) -> str:
-    """
-    Si val arranca con "{cipher}", quita ese prefijo y
-    llama a /decrypt. Si no, lo devuelve tal cual.
-    """
-    if isinstance(val, str) and val.startswith("{cipher}"):
-        cipher_text = val[len("{cipher}"):]
-        result = decrypt_value(cipher_text)
-        print(f"[firebase_config] Decrypted: {result}")  # Debug
-        return result
-    print(f"[firebase_config] Raw: {val}")  # Debug
-    return val
+_lock = threading.Lock()
+_client = None
 
 def _normalize_newlines(s: str) -> str:
     # Convierte las barras invertidas dobles en saltos reales:
     return s.replace("\\n", "\n")
-# 2) Reconstruye el dict de credenciales,
-#    desencriptando únicamente los campos cifrados
-service_account_info = {
-    "type":                        _maybe_decrypt(cfg.get("type", "")),
-    "project_id":                  _maybe_decrypt(cfg.get("project_id", "")),
-    "private_key_id":              _maybe_decrypt(cfg.get("private_key_id", "")),
-    "private_key":                  _normalize_newlines(_maybe_decrypt(cfg.get("private_key",""))),
-    "client_email":                _maybe_decrypt(cfg.get("client_email", "")),
-    "client_id":                   _maybe_decrypt(cfg.get("client_id", "")),
-    "auth_uri":                    _maybe_decrypt(cfg.get("auth_uri", "")),
-    "token_uri":                   _maybe_decrypt(cfg.get("token_uri", "")),
-    "auth_provider_x509_cert_url": _maybe_decrypt(cfg.get("auth_provider_x509_cert_url", "")),
-    "client_x509_cert_url":        _maybe_decrypt(cfg.get("client_x509_cert_url", "")),
-    "universe_domain":             _maybe_decrypt(cfg.get("universe_domain", "")),
-}
-
-# Debug: imprimir todo el dict reconstruido
-print("[firebase_config] service_account_info:")
-for k, v in service_account_info.items():
-    print(f"  {k}: {repr(v)}")
-
-# 3) Inicializa Firebase solo una vez
-if not firebase_admin._apps:
-    cred = credentials.Certificate(service_account_info)
-    firebase_admin.initialize_app(cred)
-
-# 4) Exporta el cliente de Firestore
-db = firestore.client()
+
+def init_firebase():
+    """
+    Inicializa Firebase y el cliente de Firestore una sola vez.
+    Lo llama el arranque del servicio (en paralelo con el resto de
+    dependencias); si algo usa `db` antes, se inicializa en ese momento.
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is not None:
+            return _client
+
+        # 1) Sección “firebase”, con los valores {cipher} ya descifrados en un solo round trip
+        cfg = fetch_config(decrypt=True).get("firebase", {})
+
+        # 2) Reconstruye el dict de credenciales
+        service_account_info = {
+            "type":                        cfg.get("type", ""),
+            "project_id":                  cfg.get("project_id", ""),
+            "private_key_id":              cfg.get("private_key_id", ""),
+            "private_key":                 _normalize_newlines(cfg.get("private_key", "")),
+            "client_email":                cfg.get("client_email", ""),
+            "client_id":                   cfg.get("client_id", ""),
+            "auth_uri":                    cfg.get("auth_uri", ""),
+            "token_uri":                   cfg.get("token_uri", ""),
+            "auth_provider_x509_cert_url": cfg.get("auth_provider_x509_cert_url", ""),
+            "client_x509_cert_url":        cfg.get("client_x509_cert_url", ""),
+            "universe_domain":             cfg.get("universe_domain", ""),
+        }
+
+        # 3) Inicializa Firebase solo una vez
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(service_account_info)
+            firebase_admin.initialize_app(cred)
+
+        _client = firestore.client()
+        return _client
+
+def open_channel(collection: str) -> None:
+    """
+    Consulta mínima (un documento) para abrir el canal gRPC de Firestore y
+    obtener el token de Google antes de la primera petición real.
+    """
+    list(init_firebase().collection(collection).limit(1).stream())
+
+class _LazyFirestore:
+    # Se comporta como el cliente de Firestore, pero lo crea al primer uso
+    def __getattr__(self, name):
+        return getattr(init_firebase(), name)
+
+# 4) Exporta el cliente de Firestore (los repositorios siguen importando `db`)
+db = _LazyFirestore()
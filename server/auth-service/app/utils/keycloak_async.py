@@ -0,0 +1,283 @@
+# app/utils/keycloak_async.py
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+from keycloak.exceptions import (
+    KeycloakAuthenticationError,
+    KeycloakDeleteError,
+    KeycloakGetError,
+    KeycloakPostError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class KeycloakAsyncClient:
+    """
+    Cliente asíncrono de Keycloak para los caminos calientes del servicio
+    (login, introspección y alta de usuarios).
+
+    - Un único `httpx.AsyncClient` con conexiones keep-alive reutilizadas.
+    - Timeouts explícitos y un semáforo que limita las llamadas concurrentes.
+    - El access token de administración se reutiliza entre peticiones y solo
+      se renueva poco antes de expirar (o si Keycloak lo rechaza).
+
+    Lanza las mismas excepciones de `python-keycloak` que el cliente síncrono.
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        realm: str,
+        client_id: str,
+        client_secret: Optional[str],
+        admin_username: str,
+        admin_password: str,
+        admin_client_id: str = "admin-cli",
+        max_connections: int = 50,
+        max_concurrency: int = 20,
+        timeout: float = 5,
+    ):
+        self.server_url = server_url.rstrip("/")
+        self.realm = realm
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.admin_username = admin_username
+        self.admin_password = admin_password
+        self.admin_client_id = admin_client_id
+
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._timeout = httpx.Timeout(timeout)
+        self._max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._admin_token: Optional[str] = None
+        self._admin_token_expires_at = 0.0
+        self._admin_lock = asyncio.Lock()
+
+    # ---------- URLs ----------
+
+    @property
+    def _oidc_url(self) -> str:
+        return f"{self.server_url}/realms/{self.realm}/protocol/openid-connect"
+
+    @property
+    def _admin_url(self) -> str:
+        return f"{self.server_url}/admin/realms/{self.realm}"
+
+    # ---------- Transporte ----------
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._client
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self._http()
+        async with self._semaphore:
+            return await client.request(method, url, **kwargs)
+
+    async def connect(self) -> None:
+        """
+        Abre el pool de conexiones y obtiene el token de admin de antemano,
+        así el primer registro no paga el handshake con Keycloak.
+        """
+        await self._get_admin_token()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- OpenID Connect ----------
+
+    def _client_credentials(self) -> dict:
+        data = {"client_id": self.client_id}
+        if self.client_secret:
+            data["client_secret"] = self.client_secret
+        return data
+
+    async def token(self, username: str, password: str) -> dict:
+        response = await self._request(
+            "POST",
+            f"{self._oidc_url}/token",
+            data={
+                **self._client_credentials(),
+                "grant_type": "password",
+                "username": username,
+                "password": password,
+            },
+        )
+        if response.status_code != 200:
+            raise KeycloakAuthenticationError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+        return response.json()
+
+    async def refresh_token(self, refresh_token: str) -> dict:
+        response = await self._request(
+            "POST",
+            f"{self._oidc_url}/token",
+            data={
+                **self._client_credentials(),
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+            },
+        )
+        if response.status_code != 200:
+            raise KeycloakAuthenticationError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+        return response.json()
+
+    async def logout(self, refresh_token: str) -> None:
+        response = await self._request(
+            "POST",
+            f"{self._oidc_url}/logout",
+            data={**self._client_credentials(), "refresh_token": refresh_token},
+        )
+        if response.status_code not in (200, 204):
+            raise KeycloakPostError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+
+    async def revoke(self, token: str, token_type_hint: str = "access_token") -> None:
+        # Tras esto la introspección de Keycloak devuelve el token como inactivo
+        response = await self._request(
+            "POST",
+            f"{self._oidc_url}/revoke",
+            data={**self._client_credentials(), "token": token, "token_type_hint": token_type_hint},
+        )
+        if response.status_code not in (200, 204):
+            raise KeycloakPostError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+
+    async def introspect(self, token: str) -> dict:
+        response = await self._request(
+            "POST",
+            f"{self._oidc_url}/token/introspect",
+            data={**self._client_credentials(), "token": token},
+        )
+        if response.status_code != 200:
+            raise KeycloakPostError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+        return response.json()
+
+    # ---------- Admin API ----------
+
+    async def _get_admin_token(self, force: bool = False) -> str:
+        if not force and self._admin_token and time.monotonic() < self._admin_token_expires_at:
+            return self._admin_token
+
+        async with self._admin_lock:
+            # Otra corrutina pudo renovarlo mientras esperábamos
+            if not force and self._admin_token and time.monotonic() < self._admin_token_expires_at:
+                return self._admin_token
+
+            response = await self._request(
+                "POST",
+                f"{self._oidc_url}/token",
+                data={
+                    "client_id": self.admin_client_id,
+                    "grant_type": "password",
+                    "username": self.admin_username,
+                    "password": self.admin_password,
+                },
+            )
+            if response.status_code != 200:
+                raise KeycloakAuthenticationError(
+                    error_message=response.text,
+                    response_code=response.status_code,
+                    response_body=response.content,
+                )
+            payload = response.json()
+            self._admin_token = payload["access_token"]
+            # Se renueva 30 s antes de que expire
+            self._admin_token_expires_at = time.monotonic() + max(payload.get("expires_in", 60) - 30, 0)
+            return self._admin_token
+
+    async def _admin_request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        token = await self._get_admin_token()
+        response = await self._request(
+            method, f"{self._admin_url}{path}",
+            headers={"Authorization": f"Bearer {token}"}, **kwargs
+        )
+        if response.status_code == 401:
+            # Token de admin revocado o expirado antes de tiempo: un reintento
+            token = await self._get_admin_token(force=True)
+            response = await self._request(
+                method, f"{self._admin_url}{path}",
+                headers={"Authorization": f"Bearer {token}"}, **kwargs
+            )
+        return response
+
+    async def get_users(self, query: Optional[dict] = None) -> list:
+        response = await self._admin_request("GET", "/users", params=query or {})
+        if response.status_code != 200:
+            raise KeycloakGetError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+        return response.json()
+
+    async def create_user(self, payload: dict) -> str:
+        response = await self._admin_request("POST", "/users", json=payload)
+        if response.status_code != 201:
+            raise KeycloakPostError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+        # Keycloak devuelve el id del nuevo usuario en la cabecera Location
+        return response.headers["Location"].rstrip("/").split("/")[-1]
+
+    async def delete_user(self, user_id: str) -> None:
+        response = await self._admin_request("DELETE", f"/users/{user_id}")
+        if response.status_code not in (204, 404):
+            raise KeycloakDeleteError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+
+    async def get_realm_role(self, role_name: str) -> dict:
+        response = await self._admin_request("GET", f"/roles/{role_name}")
+        if response.status_code != 200:
+            raise KeycloakGetError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
+        return response.json()
+
+    async def assign_realm_roles(self, user_id: str, roles: list) -> None:
+        response = await self._admin_request(
+            "POST", f"/users/{user_id}/role-mappings/realm", json=roles
+        )
+        if response.status_code not in (200, 204):
+            raise KeycloakPostError(
+                error_message=response.text,
+                response_code=response.status_code,
+                response_body=response.content,
+            )
@@ -1,45 +1,59 @@
 # app/utils/keycloak_config.py
 
-from app.config_loader import fetch_config, decrypt_value
+from app.config_loader import fetch_config
 
-cfg = fetch_config().get("keycloak", {})
-def _strip_and_decrypt(field_name: str) -> str:
-    raw = cfg.get(field_name, "")
+# 1) Sección "keycloak", con los valores {cipher} ya descifrados en un solo round trip
+cfg = fetch_config(decrypt=True).get("keycloak", {})
 
-    if raw.startswith("{cipher}"):
-        token = raw[len("{cipher}"):]
-        plain = decrypt_value(token)
-   
-        return plain
-    return raw
-
-# 2) Extrae y desencripta los valores cifrados
+# 2) Extrae los valores
 server_url = cfg["url"].rstrip("/") + "/keycloak"
 realm         = cfg["realm"]
 client_id     = cfg["client_id"]
-client_secret = _strip_and_decrypt("client_secret")
+client_secret = cfg.get("client_secret", "")
 admin_user    = cfg.get("username", "admin")
-admin_pass    = _strip_and_decrypt("password")
-
-# 3) Inicializa KeycloakAdmin
-from keycloak import KeycloakAdmin, KeycloakOpenID
-
-keycloak_admin = KeycloakAdmin(
-    server_url=server_url + "/",
-    username=admin_user,
-    password=admin_pass,
-    realm_name=realm,
-    client_id="admin-cli",
-    verify=True
-)
-print("[keycloak_config] Initialized KeycloakAdmin")
+admin_pass    = cfg.get("password", "")
+
+# 3) Clientes síncronos de python-keycloak (KeycloakAdmin / KeycloakOpenID).
+#    El servicio usa `keycloak_async`; estos se construyen solo si alguien los
+#    importa, así no se pagan en cada arranque.
+def _build_keycloak_admin():
+    from keycloak import KeycloakAdmin
+    return KeycloakAdmin(
+        server_url=server_url + "/",
+        username=admin_user,
+        password=admin_pass,
+        realm_name=realm,
+        client_id="admin-cli",
+        verify=True
+    )
+
+def _build_keycloak_openid():
+    from keycloak import KeycloakOpenID
+    return KeycloakOpenID(
+        server_url=server_url + "/",
+        realm_name=realm,
+        client_id=client_id,
+        client_secret_key=client_secret,
+        verify=True
+    )
+
+_lazy_clients = {"keycloak_admin": _build_keycloak_admin, "keycloak_openid": _build_keycloak_openid}
+
+def __getattr__(name):
+    # PEP 562: `from app.utils.keycloak_config import keycloak_admin` sigue funcionando
+    if name not in _lazy_clients:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    client = globals()[name] = _lazy_clients[name]()
+    return client
+
+# 4) Cliente asíncrono con pool de conexiones para login, introspección y admin
+from app.utils.keycloak_async import KeycloakAsyncClient
 
-# 4) Inicializa KeycloakOpenID
-keycloak_openid = KeycloakOpenID(
-    server_url=server_url + "/",
-    realm_name=realm,
+keycloak_async = KeycloakAsyncClient(
+    server_url=server_url,
+    realm=realm,
     client_id=client_id,
-    client_secret_key=client_secret,
-    verify=True
+    client_secret=client_secret,
+    admin_username=admin_user,
+    admin_password=admin_pass,
 )
-print("[keycloak_config] Initialized KeycloakOpenID")
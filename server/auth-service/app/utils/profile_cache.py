@@ -0,0 +1,41 @@
+# app/utils/profile_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class ProfileCache:
+    """
+    Caché LRU con TTL de los perfiles de usuario leídos de Firestore.
+
+    Solo guarda los campos que necesita la autorización (p.ej. `user_type`),
+    evitando una lectura a Firestore en cada `/me`, `/dashboard` o `/client`.
+    No hay invalidación: los documentos se modifican desde otros servicios, así
+    que un perfil puede quedar desactualizado hasta `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int = 50_000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, profile = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return dict(profile)
+
+    def set(self, user_id: str, profile: dict) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, dict(profile))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
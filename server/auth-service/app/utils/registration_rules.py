@@ -0,0 +1,165 @@
+# app/utils/registration_rules.py
+import re
+from datetime import date, datetime
+from typing import Optional
+
+PHONE_PATTERN = r"^\+?[1-9]\d{7,14}$"  # Formato internacional
+
+
+def validate_registration(fields: dict) -> Optional[str]:
+    """
+    Reglas de negocio del registro, compartidas por `/register` y `/register/bulk`.
+    Devuelve el mensaje del primer error encontrado, o None si los datos son válidos.
+    """
+    password = fields.get("password") or ""
+    user_type = fields.get("user_type")
+
+    # Validación de contraseñas
+    if len(password) < 8:
+        return "La contraseña debe tener al menos 8 caracteres."
+
+    if not any(char.isdigit() for char in password):
+        return "La contraseña debe contener al menos un número."
+
+    if not any(char.isupper() for char in password):
+        return "La contraseña debe contener al menos una letra mayúscula."
+
+    if not any(char in "!@#$%^&*()-_+=" for char in password):
+        return "La contraseña debe contener al menos un carácter especial (!@#$%^&*()-_+=)."
+
+    if password != fields.get("confirm_password"):
+        return "Las contraseñas no coinciden."
+
+    # Validación del tipo de usuario
+    if user_type not in ["gym_owner", "gym_member"]:
+        return "El tipo de usuario debe ser 'gym_owner' o 'gym_member'."
+
+    # Validación de campos obligatorios según el tipo de usuario
+    if user_type == "gym_owner":
+        if not fields.get("gym_name"):
+            return "El nombre del gimnasio es obligatorio para dueños de gimnasio."
+        if not fields.get("gym_address"):
+            return "La dirección del gimnasio es obligatoria para dueños de gimnasio."
+        if not fields.get("gym_phone"):
+            return "El teléfono del gimnasio es obligatorio para dueños de gimnasio."
+        if not fields.get("opening_hours"):
+            return "El horario de atención del gimnasio es obligatorio para dueños de gimnasio."
+        if not fields.get("services_offered"):
+            return "Debe especificar al menos un servicio ofrecido por el gimnasio."
+        capacity = fields.get("capacity")
+        if capacity is not None and capacity <= 0:
+            return "La capacidad del gimnasio debe ser un número positivo."
+
+    if user_type == "gym_member":
+        if not fields.get("gym_id"):
+            return "El ID del gimnasio es obligatorio para miembros."
+        if not fields.get("membership_number"):
+            return "El número de membresía es obligatorio para miembros."
+        birth_date = fields.get("birth_date")
+        if birth_date is None:
+            return "La fecha de nacimiento es obligatoria para miembros."
+
+        # Validar que la persona tenga al menos 14 años para registrarse
+        today = datetime.today().date()
+        age = (today - birth_date).days // 365
+        if age < 14:
+            return "Debes tener al menos 14 años para registrarte."
+
+        if fields.get("gender") not in ["Masculino", "Femenino", "Otro"]:
+            return "El género debe ser 'Masculino', 'Femenino' o 'Otro'."
+
+    # Validación del número de teléfono
+    if not re.match(PHONE_PATTERN, fields.get("phone") or ""):
+        return "El número de teléfono no es válido. Debe contener entre 8 y 15 dígitos."
+
+    # Validación de redes sociales
+    social_media = fields.get("social_media")
+    if social_media:
+        if not social_media.startswith("http"):
+            return "El enlace a redes sociales debe ser una URL válida."
+
+    return None
+
+
+def _as_list(value) -> list:
+    if isinstance(value, list):
+        return value
+    return value.split(",") if value else []
+
+
+def build_user_data(fields: dict) -> dict:
+    """
+    Estructura esperada por `UserRegister` a partir de los campos planos del formulario.
+    """
+    user_type = fields.get("user_type")
+    return {
+        "full_name": fields.get("full_name"),
+        "email": fields.get("email"),
+        "password": fields.get("password"),
+        "confirm_password": fields.get("confirm_password"),
+        "phone": fields.get("phone"),
+        "user_type": user_type,
+        "gym_info": {
+            "name": fields.get("gym_name"),
+            "address": fields.get("gym_address"),
+            "phone": fields.get("gym_phone"),
+            "opening_hours": fields.get("opening_hours"),
+            "services_offered": _as_list(fields.get("services_offered")),
+            "capacity": fields.get("capacity"),
+            "social_media": fields.get("social_media"),
+        } if user_type == "gym_owner" else None,
+        "member_info": {
+            "gym_id": fields.get("gym_id"),
+            "membership_number": fields.get("membership_number"),
+            "birth_date": fields.get("birth_date"),
+            "gender": fields.get("gender"),
+            "training_goals": _as_list(fields.get("training_goals")),
+            "activity_preferences": _as_list(fields.get("activity_preferences")),
+        } if user_type == "gym_member" else None,
+    }
+
+
+# Campos que en NDJSON pueden venir como lista en lugar de texto separado por comas
+LIST_FIELDS = ("services_offered", "training_goals", "activity_preferences")
+
+
+def _as_text(name: str, value):
+    # En NDJSON un número (p. ej. el teléfono) llega como int: se acepta como texto
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if name in LIST_FIELDS and isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"El campo '{name}' debe ser texto.")
+    return value
+
+
+def coerce_row(row: dict) -> dict:
+    """
+    Convierte una fila de CSV/NDJSON a los tipos del formulario. Los números
+    se aceptan como texto en los campos de texto.
+    Lanza ValueError si un campo tiene un tipo o formato inválido.
+    """
+    fields = {str(k).strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+    fields = {k: v for k, v in fields.items() if v not in ("", None)}
+
+    capacity = fields.get("capacity")
+    if capacity is not None and (isinstance(capacity, bool) or not isinstance(capacity, int)):
+        try:
+            fields["capacity"] = int(_as_text("capacity", capacity))
+        except ValueError:
+            raise ValueError("La capacidad del gimnasio debe ser un número entero.")
+
+    if "birth_date" in fields and not isinstance(fields["birth_date"], date):
+        try:
+            fields["birth_date"] = date.fromisoformat(_as_text("birth_date", fields["birth_date"]))
+        except ValueError:
+            raise ValueError("La fecha de nacimiento debe tener formato AAAA-MM-DD.")
+
+    for name, value in fields.items():
+        if name not in ("capacity", "birth_date"):
+            fields[name] = _as_text(name, value)
+
+    # En carga masiva la confirmación es opcional
+    fields.setdefault("confirm_password", fields.get("password"))
+    return fields
@@ -0,0 +1,113 @@
+# app/utils/session_store.py
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+
+class SessionStore(ABC):
+    """
+    Interfaz del almacén de sesiones del lado del servidor.
+
+    Cada sesión es un dict serializable a JSON. `get` acepta un `ttl` para
+    implementar expiración deslizante: cada lectura renueva la sesión.
+    `shared` indica si lo que se guarda es visible para otros procesos.
+    """
+
+    shared = False
+
+    @abstractmethod
+    async def get(self, session_id: str, ttl: Optional[float] = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def set(self, session_id: str, session: dict, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Sesiones en memoria del proceso, con LRU acotado. Sirve para una sola
+    réplica con un solo worker; para más, usar `RedisSessionStore`.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, session_id: str, ttl: Optional[float] = None) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            expires_at, session = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                del self._entries[session_id]
+                return None
+            if ttl:
+                self._entries[session_id] = (now + ttl, session)
+            self._entries.move_to_end(session_id)
+            return dict(session)
+
+    async def set(self, session_id: str, session: dict, ttl: float) -> None:
+        with self._lock:
+            self._entries[session_id] = (time.monotonic() + ttl, dict(session))
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sesiones en un servidor compatible con el protocolo Redis (Redis, Valkey,
+    KeyDB…), compartidas entre workers y réplicas.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "ezto:session:"):
+        import redis.asyncio as redis  # dependencia solo necesaria para este backend
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    async def get(self, session_id: str, ttl: Optional[float] = None) -> Optional[dict]:
+        key = self.prefix + session_id
+        # GETEX lee y renueva la expiración en un solo round trip
+        raw = await (self._redis.getex(key, ex=int(ttl)) if ttl else self._redis.get(key))
+        return json.loads(raw) if raw else None
+
+    async def set(self, session_id: str, session: dict, ttl: float) -> None:
+        await self._redis.set(self.prefix + session_id, json.dumps(session), ex=int(ttl))
+
+    async def delete(self, session_id: str) -> None:
+        await self._redis.delete(self.prefix + session_id)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_session_store() -> SessionStore:
+    """
+    Elige el backend según `SESSION_STORE` ("memory" por defecto o "redis").
+    """
+    backend = os.getenv("SESSION_STORE", "memory")
+    if backend == "redis":
+        return RedisSessionStore(os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0"))
+    return InMemorySessionStore(max_entries=int(os.getenv("SESSION_MAX_ENTRIES", 100000)))
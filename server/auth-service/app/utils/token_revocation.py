@@ -0,0 +1,137 @@
+# app/utils/token_revocation.py
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Optional
+
+from app.utils.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+class RevocationList:
+    """
+    Lista de tokens revocados (logout) mientras sigan siendo válidos.
+
+    La verificación local de firmas no detecta un logout; esta lista cubre
+    ese hueco. Cada entrada vive hasta el `exp` del token y nunca se descarta
+    antes: olvidar una revocación vigente volvería a dar por válido el token.
+
+    - Con `store` (un almacén compartido, p. ej. Redis) la revocación vale
+      para todos los workers y réplicas: se escribe en el almacén y lo que no
+      está en la copia local se consulta ahí. Un "no revocado" del almacén se
+      recuerda `negative_ttl` segundos para no ir a Redis en cada petición.
+    - Si el almacén falla, no se puede descartar un logout hecho en otro
+      worker: durante `retry_seconds` no se le consulta y `saturated()` pide
+      verificar contra Keycloak (nunca se acepta el token a ciegas).
+    - Sin almacén la lista es del proceso y está acotada por `max_entries`.
+      Si se llena de revocaciones vigentes, la nueva no se anota y la lista
+      queda saturada hasta el `exp` de ese token: mientras tanto `saturated()`
+      indica que hay que verificar contra Keycloak.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 50_000,
+        default_ttl: float = 86400,
+        store: Optional[SessionStore] = None,
+        prefix: str = "revoked:",
+        negative_ttl: float = 1.0,
+        retry_seconds: float = 5.0,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.store = store
+        self.prefix = prefix
+        self.negative_ttl = negative_ttl
+        self.retry_seconds = retry_seconds
+        self._entries: dict[str, float] = {}
+        self._misses: dict[str, float] = {}
+        self._saturated_until = 0.0
+        self._store_down_until = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @property
+    def shared(self) -> bool:
+        return self.store is not None
+
+    async def revoke(self, token: str, exp: Optional[float] = None) -> None:
+        key = self._key(token)
+        expires_at = float(exp) if exp else time.time() + self.default_ttl
+        remembered = self._remember(key, expires_at)
+        self._misses.pop(key, None)
+
+        if self.store is not None:
+            ttl = expires_at - time.time()
+            if ttl > 0:
+                try:
+                    await self.store.set(self.prefix + key, {"exp": expires_at}, math.ceil(ttl))
+                except Exception:
+                    logger.warning("No pude guardar la revocación en el almacén compartido")
+                    self._store_failed()
+        elif not remembered:
+            with self._lock:
+                self._saturated_until = max(self._saturated_until, expires_at)
+
+    async def is_revoked(self, token: str) -> bool:
+        key = self._key(token)
+        expires_at = self._entries.get(key)
+        if expires_at is not None:
+            if expires_at >= time.time():
+                return True
+            with self._lock:
+                self._entries.pop(key, None)
+
+        if self.store is None:
+            return False
+        now = time.time()
+        if self._store_down_until > now or self._misses.get(key, 0) > now:
+            return False
+        try:
+            entry = await self.store.get(self.prefix + key)
+        except Exception:
+            logger.warning("Almacén de revocaciones no disponible, se verifica contra Keycloak")
+            self._store_failed()
+            return False
+        if entry is None:
+            self._remember_miss(key)
+            return False
+        self._remember(key, entry["exp"])
+        return True
+
+    def saturated(self) -> bool:
+        now = time.time()
+        return self._saturated_until > now or self._store_down_until > now
+
+    def _store_failed(self) -> None:
+        with self._lock:
+            self._store_down_until = time.time() + self.retry_seconds
+            self._misses.clear()
+
+    def _remember_miss(self, key: str) -> None:
+        if self.negative_ttl <= 0:
+            return
+        with self._lock:
+            if len(self._misses) >= self.max_entries:
+                self._misses.clear()
+            self._misses[key] = time.time() + self.negative_ttl
+
+    def _remember(self, key: str, expires_at: float) -> bool:
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._prune()
+                if len(self._entries) >= self.max_entries:
+                    return False
+            self._entries[key] = expires_at
+            return True
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [k for k, exp in self._entries.items() if exp < now]
+        for k in expired:
+            del self._entries[k]
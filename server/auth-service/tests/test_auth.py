@@ -7,7 +7,7 @@ from app.main import app
 
 # Verifica que se rechace un token inválido en la ruta protegida /auth/me
 @pytest.mark.asyncio
-@patch("app.utils.keycloak_config.keycloak_openid.introspect")
+@patch("app.utils.keycloak_config.keycloak_async.introspect", new_callable=AsyncMock)
 async def test_get_current_user_invalid_token(mock_introspect):
     mock_introspect.return_value = {"active": False}
 
@@ -18,11 +18,11 @@ async def test_get_current_user_invalid_token(mock_introspect):
 
 # Prueba exitosa de login: usuario válido, token válido, respuesta esperada
 @pytest.mark.asyncio
-@patch("app.utils.keycloak_config.keycloak_openid.token")
-@patch("app.services.auth_service.AuthService.verify_token", new_callable=AsyncMock)        
-async def test_login_success(mock_verify_token, mock_token):
+@patch("app.utils.keycloak_config.keycloak_async.token", new_callable=AsyncMock)
+@patch("app.services.auth_service.AuthService.user_from_issued_token", new_callable=AsyncMock)        
+async def test_login_success(mock_user_from_token, mock_token):
     mock_token.return_value = {"access_token": "fake-token"}
-    mock_verify_token.return_value = {
+    mock_user_from_token.return_value = {
         "user_id": "abc123",
         "email": "test@ezto.com",
         "role": "admin"
@@ -43,7 +43,7 @@ async def test_login_success(mock_verify_token, mock_token):
 
 # Prueba de login con credenciales incorrectas: debería lanzar excepción y retornar 401
 @pytest.mark.asyncio
-@patch("app.utils.keycloak_config.keycloak_openid.token")
+@patch("app.utils.keycloak_config.keycloak_async.token", new_callable=AsyncMock)
 async def test_login_failure(mock_token):
     mock_token.side_effect = Exception("Invalid credentials")
 
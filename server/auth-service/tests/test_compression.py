@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.middleware.compression_middleware import CompressionMiddleware, negotiate
+
+ITEMS = [{"id": i, "name": "Yoga avanzado", "status": True} for i in range(500)]
+
+
+def make_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/items")
+    async def items():
+        return ITEMS
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1000, routes={"/items": {"gzip": 9}})
+    return app
+
+
+# Gana la mayor q del cliente; a igual q, el orden de preferencia del servidor
+def test_negotiate():
+    preference = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, deflate, br, zstd", preference) == "zstd"
+    assert negotiate("gzip;q=1.0, br;q=0.5", preference) == "gzip"
+    assert negotiate("br;q=0, *;q=0.1", preference) == "zstd"
+    assert negotiate("identity", preference) is None
+    assert negotiate("", preference) is None
+
+
+# Cada codificación devuelve el mismo JSON y un listado repetido se comprime una sola vez
+def test_compressed_bodies_are_cached():
+    CompressionMiddleware.cache.clear()
+    app = make_app()
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return [await client.get("/items", headers={"accept-encoding": "gzip"}) for _ in range(3)]
+
+    responses = asyncio.run(scenario())
+    for response in responses:
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == ITEMS
+
+    metrics = CompressionMiddleware.cache.metrics()
+    assert (metrics["misses"], metrics["hits"], metrics["entries"]) == (1, 2, 1)
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+
+from app.utils.consul_client import ServiceDiscovery
+
+HEALTHY = [
+    {"Node": {"Address": "10.0.0.1"}, "Service": {"Address": "10.0.0.1", "Port": 8000}},
+    {"Node": {"Address": "10.0.0.2"}, "Service": {"Address": "", "Port": 8000}},
+]
+
+
+def make_transport(down: set, hits: list):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/v1/health/service/"):
+            if request.url.params["index"] != "0":
+                await asyncio.sleep(60)  # blocking query sin cambios
+            return httpx.Response(200, json=HEALTHY, headers={"X-Consul-Index": "7"})
+        if request.url.host in down:
+            raise httpx.ConnectError("connection refused", request=request)
+        hits.append(request.url.host)
+        return httpx.Response(200, json={"ok": True})
+
+    return httpx.MockTransport(handler)
+
+
+# Las llamadas se reparten entre instancias sanas y saltan las caídas
+def test_round_robin_and_failover():
+    async def scenario():
+        hits = []
+        discovery = ServiceDiscovery("http://consul:8500", transport=make_transport({"10.0.0.1"}, hits))
+
+        assert await discovery.instances("promotions-service") == ["http://10.0.0.1:8000", "http://10.0.0.2:8000"]
+        for _ in range(3):
+            response = await discovery.request("promotions-service", "GET", "/promotions/p1")
+            assert response.status_code == 200
+        assert hits == ["10.0.0.2"] * 3
+
+        await discovery.close()
+
+    asyncio.run(scenario())
+
+
+# Sin Consul se usa la URL de respaldo
+def test_fallback_without_consul():
+    async def scenario():
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "consul":
+                raise httpx.ConnectError("consul caído", request=request)
+            return httpx.Response(200, json={"host": request.url.host})
+
+        discovery = ServiceDiscovery("http://consul:8500", transport=httpx.MockTransport(handler))
+        response = await discovery.request(
+            "promotions-service", "GET", "/promotions/p1", fallback="http://promotions-service:8000"
+        )
+        assert response.json() == {"host": "promotions-service"}
+        await discovery.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,24 @@
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch, AsyncMock
+from app.main import app
+
+
+# La respuesta de ForwardAuth lleva la identidad pero nunca el secreto del gateway
+@pytest.mark.asyncio
+@patch.dict("os.environ", {"GATEWAY_SHARED_SECRET": "s3cret"})
+@patch("app.services.token_service.TokenService.gateway_verdict", new_callable=AsyncMock)
+async def test_verify_never_returns_gateway_secret(mock_verdict):
+    mock_verdict.return_value = {"user_id": "abc123", "email": "test@ezto.com", "role": "admin"}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/internal/verify", headers={"Authorization": "Bearer token"})
+        assert response.status_code == 200
+        assert response.headers["X-User-Id"] == "abc123"
+        assert "x-gateway-secret" not in response.headers
+        assert "s3cret" not in response.text
+
+        # Por el prefijo público la ruta no existe
+        response = await client.get("/auth/internal/verify", headers={"Authorization": "Bearer token"})
+        assert response.status_code == 404
+        assert "x-gateway-secret" not in response.headers
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
+from app.utils.rate_limiter import SlidingWindowLimiter
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return JSONResponse({"ok": True}, headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    return app
+
+
+def get_many(app: FastAPI, path: str, times: int) -> list:
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, client=("10.0.0.9", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path) for _ in range(times)]
+
+    return asyncio.run(scenario())
+
+
+# Pasado el límite responde 429 con Retry-After, y las cabeceras de seguridad van igual
+def test_rate_limit_and_security_headers():
+    RateLimitMiddleware.limiter = SlidingWindowLimiter()
+    RateLimitMiddleware.configure({"rate_limit": {"max_requests": 2, "window_seconds": 60, "backend": "memory"}})
+
+    responses = get_many(make_app(), "/ping", 3)
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert int(responses[2].headers["retry-after"]) >= 1
+
+    for response in responses:
+        assert response.headers["x-content-type-options"] == "nosniff"
+    # Reemplaza la cabecera que puso la ruta, no la duplica
+    assert responses[0].headers.get_list("x-frame-options") == ["DENY"]
+
+    RateLimitMiddleware.configure({"rate_limit": {"max_requests": 100}})
+
+
+# Detrás del gateway cuenta la IP que agregó el proxy, no la que manda el cliente
+def test_client_id_uses_rightmost_forwarded_for():
+    RateLimitMiddleware.configure({"rate_limit": {"trust_forwarded_for": True}})
+    middleware = RateLimitMiddleware(make_app())
+    scope = {"client": ("172.18.0.5", 80), "headers": [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.7")]}
+
+    assert middleware._client_id(scope) == "203.0.113.7"
+    assert middleware._client_id({**scope, "headers": []}) == "172.18.0.5"
+
+    RateLimitMiddleware.configure({"rate_limit": {"trust_forwarded_for": False}})
@@ -0,0 +1,36 @@
+from app.utils.rate_limiter import SlidingWindowLimiter, SharedMemoryLimiter
+
+
+# La ventana deslizante pondera la ventana anterior y libera cupo gradualmente
+def test_sliding_window():
+    limiter = SlidingWindowLimiter()
+
+    assert all(limiter.hit("ip", limit=10, window=60, now=t).allowed for t in range(10))
+    blocked = limiter.hit("ip", limit=10, window=60, now=30)
+    assert not blocked.allowed and blocked.retry_after > 0
+
+    # A mitad de la ventana siguiente cuenta la mitad de las 10 anteriores
+    allowed = [limiter.hit("ip", limit=10, window=60, now=90).allowed for _ in range(6)]
+    assert allowed == [True] * 5 + [False]
+    assert limiter.metrics()["rejected"] == 2
+
+
+# Los clientes inactivos se descartan y el total de claves queda acotado
+def test_bounded_memory():
+    limiter = SlidingWindowLimiter(max_entries=3)
+    for i in range(5):
+        limiter.hit(f"ip-{i}", limit=10, window=60, now=0)
+    assert limiter.metrics()["tracked_clients"] == 3
+
+    limiter.hit("ip-nueva", limit=10, window=60, now=500)
+    assert limiter.metrics()["tracked_clients"] == 1
+
+
+# El backend compartido ve los mismos contadores desde varios procesos (aquí, dos instancias)
+def test_shared_memory_backend(tmp_path):
+    path = str(tmp_path / "ratelimit")
+    worker_a = SharedMemoryLimiter(path, slots=64)
+    worker_b = SharedMemoryLimiter(path, slots=64)
+
+    results = [w.hit("ip", limit=4, window=60, now=0).allowed for w in (worker_a, worker_b) * 3]
+    assert results == [True] * 4 + [False] * 2
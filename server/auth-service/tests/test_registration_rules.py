@@ -0,0 +1,48 @@
+import pytest
+from app.utils.registration_rules import validate_registration, build_user_data, coerce_row
+
+MEMBER_ROW = {
+    "full_name": "Ana Pérez",
+    "email": "ana@ezto.com",
+    "password": "Abc12345!",
+    "phone": "+59170000000",
+    "user_type": "gym_member",
+    "gym_id": "gym-1",
+    "membership_number": "M-001",
+    "birth_date": "2000-01-31",
+    "gender": "Femenino",
+    "training_goals": "fuerza,cardio",
+    "activity_preferences": "",
+}
+
+
+# Una fila de CSV válida pasa las mismas reglas que /register
+def test_valid_bulk_row():
+    fields = coerce_row(MEMBER_ROW)
+
+    assert validate_registration(fields) is None
+    user_data = build_user_data(fields)
+    assert user_data["member_info"]["training_goals"] == ["fuerza", "cardio"]
+    assert user_data["member_info"]["activity_preferences"] == []
+    assert user_data["gym_info"] is None
+
+
+# Los errores de negocio de /register se reportan igual en carga masiva
+def test_invalid_bulk_row():
+    fields = coerce_row({**MEMBER_ROW, "birth_date": "2020-01-01"})
+
+    assert validate_registration(fields) == "Debes tener al menos 14 años para registrarte."
+
+
+# En NDJSON los números llegan como tales: se aceptan como texto y otros tipos se rechazan
+def test_ndjson_row_types():
+    fields = coerce_row({**MEMBER_ROW, "phone": 59170000000, "training_goals": ["fuerza"]})
+
+    assert fields["phone"] == "59170000000"
+    assert validate_registration(fields) is None
+    assert build_user_data(fields)["member_info"]["training_goals"] == ["fuerza"]
+
+    with pytest.raises(ValueError):
+        coerce_row({**MEMBER_ROW, "password": {"value": "Abc12345!"}})
+    with pytest.raises(ValueError):
+        coerce_row({**MEMBER_ROW, "gender": True})
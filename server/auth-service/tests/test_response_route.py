@@ -0,0 +1,53 @@
+import asyncio
+from typing import List, Optional
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from app.utils.response_route import ModelResponseRoute
+
+
+class Item(BaseModel):
+    id: str
+    note: Optional[str] = None
+
+
+class PrivateItem(Item):
+    secret: str = "no se expone"
+
+
+def make_app(route_class) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/items", response_model=List[Item], response_model_exclude_none=True)
+    async def items():
+        return [Item(id="a"), PrivateItem(id="b", note="x")]
+
+    @router.get("/item", response_model=Item, status_code=201)
+    async def item():
+        return {"id": "c", "extra": 1}  # dict: pasa por la validación normal
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(router)
+    return app
+
+
+def fetch(app: FastAPI) -> list:
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return [await client.get(path) for path in ("/items", "/item")]
+
+    return asyncio.run(scenario())
+
+
+# El camino rápido produce exactamente lo mismo que el de FastAPI
+def test_fast_path_matches_fastapi():
+    expected = fetch(make_app(APIRoute))
+    fast = fetch(make_app(ModelResponseRoute))
+
+    assert [(r.status_code, r.content) for r in fast] == [(r.status_code, r.content) for r in expected]
+    assert fast[0].json() == [{"id": "a"}, {"id": "b", "note": "x"}]
+    assert fast[1].status_code == 201
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from app.utils.session_store import InMemorySessionStore, SessionStore
+
+SESSION = {"user": {"user_id": "abc123", "email": "test@ezto.com", "role": "gym_owner"}}
+
+
+# Cada lectura con ttl renueva la sesión (expiración deslizante)
+def test_sliding_expiry():
+    async def scenario():
+        store = InMemorySessionStore()
+        await store.set("sid_a", SESSION, ttl=0.2)
+        await asyncio.sleep(0.15)
+        assert await store.get("sid_a", ttl=0.2) == SESSION
+        await asyncio.sleep(0.15)
+        assert await store.get("sid_a") == SESSION
+        await asyncio.sleep(0.1)
+        assert await store.get("sid_a") is None
+
+    asyncio.run(scenario())
+
+
+# Al superar el máximo se descarta la sesión menos usada
+def test_evicts_least_recently_used():
+    async def scenario():
+        store = InMemorySessionStore(max_entries=2)
+        await store.set("sid_a", SESSION, ttl=60)
+        await store.set("sid_b", SESSION, ttl=60)
+        await store.get("sid_a")
+        await store.set("sid_c", SESSION, ttl=60)
+        assert await store.get("sid_b") is None
+        assert await store.get("sid_a") == SESSION
+
+        await store.delete("sid_a")
+        assert await store.get("sid_a") is None
+
+    asyncio.run(scenario())
+
+
+# Un backend que no implementa la interfaz completa no se puede instanciar
+def test_session_store_is_abstract():
+    class GetOnlyStore(SessionStore):
+        async def get(self, session_id, ttl=None):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyStore()
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.startup import StartupOrchestrator
+
+
+# Los pasos corren en paralelo: el arranque dura lo que el más lento
+def test_steps_run_concurrently():
+    startup = StartupOrchestrator()
+    startup.step("bloqueante", lambda: time.sleep(0.2))
+    startup.step("async", lambda: None)
+
+    async def network():
+        await asyncio.sleep(0.2)
+    startup.step("red", network)
+
+    asyncio.run(startup.run())
+
+    assert {"bloqueante", "async", "red", "init"} <= set(startup.timings)
+    assert startup.timings["init"] < 350
+
+
+# Un paso opcional que falla no bloquea; uno obligatorio sí
+def test_required_step_failure():
+    def fail():
+        raise ConnectionError("consul caído")
+
+    optional = StartupOrchestrator()
+    optional.step("consul", fail, required=False)
+    asyncio.run(optional.run())
+    assert "consul" in optional.errors
+
+    required = StartupOrchestrator()
+    required.step("firebase", fail)
+    with pytest.raises(RuntimeError):
+        asyncio.run(required.run())
+    assert not required.ready
+
+
+# /ready solo pasa a verde cuando termina el calentamiento, aunque alguno falle
+def test_ready_after_warmup():
+    async def scenario():
+        startup = StartupOrchestrator()
+        startup.step("firebase", lambda: None)
+        warmed = asyncio.Event()
+
+        async def jwks():
+            await warmed.wait()
+        startup.warmup("jwks", jwks)
+        startup.warmup("firestore", lambda: 1 / 0)
+
+        await startup.run()
+        await asyncio.sleep(0.05)
+        assert not startup.ready
+
+        warmed.set()
+        await asyncio.sleep(0.05)
+        assert startup.ready
+        assert "firestore" in startup.errors and "warmup" in startup.timings
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+import time
+from app.utils.token_cache import TokenCache
+
+USER = {"user_id": "abc123", "email": "test@ezto.com", "role": "gym_owner"}
+
+
+# Un token verificado se sirve desde la caché y cuenta como acierto
+def test_cache_hit_and_miss():
+    cache = TokenCache()
+    assert cache.get("token-a") is None
+
+    cache.set("token-a", USER, exp=time.time() + 60)
+
+    assert cache.get("token-a") == USER
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+# La entrada nunca sobrevive al exp del token
+def test_cache_respects_token_exp():
+    cache = TokenCache(ttl_seconds=300)
+    cache.set("token-a", USER, exp=time.time() - 1)
+
+    assert cache.get("token-a") is None
+
+
+# Al superar el máximo se descarta el token menos usado
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_entries=2)
+    cache.set("token-a", USER)
+    cache.set("token-b", USER)
+    cache.get("token-a")
+    cache.set("token-c", USER)
+
+    assert cache.get("token-b") is None
+    assert cache.get("token-a") == USER
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from app.utils.session_store import InMemorySessionStore
+from app.utils.token_revocation import RevocationList
+
+
+# Un token revocado se rechaza hasta su expiración
+def test_revoked_token_until_exp():
+    async def scenario():
+        revocations = RevocationList()
+        await revocations.revoke("token-a", exp=time.time() + 60)
+
+        assert await revocations.is_revoked("token-a")
+        assert not await revocations.is_revoked("token-b")
+
+    asyncio.run(scenario())
+
+
+# Las entradas expiradas se descartan solas
+def test_expired_revocation_is_dropped():
+    async def scenario():
+        revocations = RevocationList()
+        await revocations.revoke("token-a", exp=time.time() - 1)
+
+        assert not await revocations.is_revoked("token-a")
+
+    asyncio.run(scenario())
+
+
+# Llena de revocaciones vigentes, la lista no olvida ninguna: queda saturada
+def test_full_list_never_drops_live_revocations():
+    async def scenario():
+        revocations = RevocationList(max_entries=10)
+        for i in range(50):
+            await revocations.revoke(f"token-{i}", exp=time.time() + 60 + i)
+
+        assert len(revocations._entries) <= 10
+        assert all([await revocations.is_revoked(f"token-{i}") for i in range(10)])
+        assert revocations.saturated()
+
+    asyncio.run(scenario())
+
+
+# Con almacén compartido, la revocación hecha en un worker se ve en otro
+def test_shared_store_revocations():
+    async def scenario():
+        store = InMemorySessionStore()
+        worker_a = RevocationList(max_entries=1, store=store)
+        worker_b = RevocationList(max_entries=1, store=store)
+        await worker_a.revoke("token-a", exp=time.time() + 60)
+        await worker_a.revoke("token-b", exp=time.time() + 60)
+
+        assert await worker_b.is_revoked("token-a")
+        assert await worker_b.is_revoked("token-b")
+        assert not worker_a.saturated()
+
+    asyncio.run(scenario())
+
+
+class BrokenStore(InMemorySessionStore):
+    async def get(self, key):
+        raise ConnectionError("redis caído")
+
+    async def set(self, key, value, ttl):
+        raise ConnectionError("redis caído")
+
+
+# Si el almacén falla no se lanza error: se recuerda lo local y se exige verificar contra Keycloak
+def test_store_failure_falls_back_to_introspection():
+    async def scenario():
+        revocations = RevocationList(store=BrokenStore(), retry_seconds=60)
+        await revocations.revoke("token-a", exp=time.time() + 60)
+
+        assert await revocations.is_revoked("token-a")
+        assert not await revocations.is_revoked("token-b")
+        assert revocations.saturated()
+
+    asyncio.run(scenario())
+
+
+# Un "no revocado" del almacén se recuerda poco tiempo; la revocación local lo anula
+def test_negative_lookup_is_cached_briefly():
+    async def scenario():
+        store = InMemorySessionStore()
+        worker_a = RevocationList(store=store, negative_ttl=60)
+        worker_b = RevocationList(store=store, negative_ttl=0)
+
+        assert not await worker_a.is_revoked("token-a")
+        await worker_b.revoke("token-a", exp=time.time() + 60)
+        assert not await worker_a.is_revoked("token-a")
+        assert await worker_b.is_revoked("token-a")
+
+        await worker_a.revoke("token-a", exp=time.time() + 60)
+        assert await worker_a.is_revoked("token-a")
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+# benchmarks/compression.py
+"""
+Benchmark de compresión de los listados: GZipMiddleware contra CompressionMiddleware.
+
+Usa los mismos documentos sintéticos que `benchmarks/json_responses.py`
+(`/classes/`, `/promotions/` y `/products/` con imágenes en base64) y mide,
+por petición repetida del mismo listado, el tiempo y los bytes enviados:
+
+    gzip (antes)   GZipMiddleware(minimum_size=1000): comprime en cada petición
+    gzip / br / zstd   CompressionMiddleware con los niveles de cada servicio:
+                   la primera petición comprime, las siguientes salen de la caché
+
+Uso:
+    python benchmarks/compression.py
+    python benchmarks/compression.py --items 500 --image-kb 30
+"""
+import argparse
+import asyncio
+import sys
+
+import orjson
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+
+from json_responses import class_docs, load_service, measure, product_docs, promotion_docs
+
+
+def build_app(body: bytes, middleware, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def listing():
+        return Response(body, media_type="application/json")
+
+    app.add_middleware(middleware, **options)
+    return app
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200, help="documentos por listado")
+    parser.add_argument("--image-kb", type=int, default=20, help="tamaño de la imagen base64 de cada producto")
+    parser.add_argument("--requests", type=int, default=50, help="peticiones por ronda")
+    parser.add_argument("--repeat", type=int, default=5, help="rondas por variante (se toma la mediana)")
+    args = parser.parse_args()
+
+    (compression,) = load_service("class-service", "app.middleware.compression_middleware")
+    middleware = compression.CompressionMiddleware
+    listings = [
+        ("/classes/", class_docs(args.items), compression.LIST_LEVELS),
+        ("/promotions/", promotion_docs(args.items), compression.LIST_LEVELS),
+        # Mismos niveles que shop-service para /products
+        ("/products/", product_docs(args.items, args.image_kb), {"zstd": 1, "br": 3, "gzip": 1}),
+    ]
+
+    async def run():
+        results = []
+        for path, docs, levels in listings:
+            body = orjson.dumps(docs, default=str)
+            variants = [("gzip (antes)", "gzip", build_app(body, GZipMiddleware, minimum_size=1000))]
+            for encoding in ("gzip", "br", "zstd"):
+                if encoding in compression.CODECS:
+                    app = build_app(body, middleware, minimum_size=1000, levels=levels)
+                    variants.append((encoding, encoding, app))
+            for name, encoding, app in variants:
+                millis, size = await measure(app, args.requests, args.repeat, {"accept-encoding": encoding})
+                results.append((path, name, millis, size, len(body)))
+        return results
+
+    results = asyncio.run(run())
+    print(f"\n{args.items} documentos por listado, {args.requests} peticiones x {args.repeat} rondas\n")
+    print(f"  {'endpoint':<14} {'variante':<13} {'ms/petición':>12} {'KB':>9} {'ratio':>7}")
+    for path, name, millis, size, original in results:
+        print(f"  {path:<14} {name:<13} {millis:12.3f} {size / 1024:9.1f} {original / size:6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# benchmarks/import_time.py
+"""
+Benchmark de arranque: cuánto cuesta importar cada servicio.
+
+Corre `python -X importtime -c "import app.main"` en el directorio de cada
+servicio (en un proceso nuevo; con `--no-bytecode` se ignoran los .pyc
+existentes y no se escriben nuevos, así se mide el arranque en frío) y resume
+la salida: tiempo total y los módulos más caros.
+
+Uso:
+    python benchmarks/import_time.py                     # todos los servicios
+    python benchmarks/import_time.py auth-service shop-service --top 15
+    python benchmarks/import_time.py --save baseline.json
+    python benchmarks/import_time.py --baseline baseline.json
+
+Con `--baseline` termina con código 1 si algún servicio importa más de
+`--tolerance` (por defecto 20 %) más lento que la línea base guardada. La
+línea base no se versiona: depende de la máquina, así que se genera con
+`--save` en el mismo entorno donde luego se compara.
+
+El import de `app.main` lee la configuración del Config-Server, así que se
+debe correr con las mismas variables de entorno que el servicio (CONFIG_URL,
+APP_NAME, CFG_USER, CFG_PWD…) o con su copia local en CONFIG_CACHE_FILE.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def discover_services() -> list:
+    return sorted(p.parent.parent.name for p in SERVER_DIR.glob("*/app/main.py"))
+
+
+def profile(service: str, module: str, no_bytecode: bool) -> dict:
+    env = dict(os.environ, APP_NAME=os.getenv("APP_NAME", service))
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    with tempfile.TemporaryDirectory() as pycache:
+        if no_bytecode:
+            # -B no escribe .pyc; un PYTHONPYCACHEPREFIX vacío hace que tampoco se lean los existentes
+            command.insert(1, "-B")
+            env["PYTHONPYCACHEPREFIX"] = pycache
+        proc = subprocess.run(
+            command,
+            cwd=SERVER_DIR / service,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+
+    # Los módulos de primer nivel suman el total (cada uno ya incluye a sus hijos)
+    total = sum(m["cumulative_ms"] for m in modules if m["depth"] == 0)
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "error"
+    return {"service": service, "total_ms": round(total, 1), "modules": modules, "error": error}
+
+
+def report(result: dict, top: int) -> None:
+    status = f"  ⚠️  {result['error']}" if result["error"] else ""
+    print(f"\n{result['service']}: {result['total_ms']:.1f} ms{status}")
+    heaviest = sorted(
+        (m for m in result["modules"] if m["depth"] <= 1),
+        key=lambda m: m["cumulative_ms"],
+        reverse=True,
+    )[:top]
+    for m in heaviest:
+        print(f"  {m['cumulative_ms']:9.1f} ms  {m['module']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("services", nargs="*", help="servicios a medir (por defecto todos)")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--no-bytecode", action="store_true", help="no reutilizar ni escribir .pyc")
+    parser.add_argument("--save", type=Path, help="guarda los totales como línea base")
+    parser.add_argument("--baseline", type=Path, help="compara contra una línea base guardada")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = [profile(s, args.module, args.no_bytecode) for s in args.services or discover_services()]
+    for result in results:
+        report(result, args.top)
+
+    totals = {r["service"]: r["total_ms"] for r in results if not r["error"]}
+    if args.save:
+        args.save.write_text(json.dumps(totals, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nLínea base guardada en {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        for service in sorted(set(totals) - set(baseline)):
+            print(f"⚠️  {service}: sin línea base, regenerarla con --save")
+        regressions = [
+            (service, baseline[service], total)
+            for service, total in totals.items()
+            if service in baseline and total > baseline[service] * (1 + args.tolerance)
+        ]
+        for service, before, after in regressions:
+            print(f"❌ {service}: {before:.1f} ms -> {after:.1f} ms")
+        if regressions:
+            return 1
+        if not totals:
+            print("\n❌ No se pudo importar ningún servicio: nada que comparar")
+            return 1
+        print("\n✅ Sin regresiones de tiempo de import")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
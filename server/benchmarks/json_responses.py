@@ -0,0 +1,234 @@
+# benchmarks/json_responses.py
+"""
+Benchmark de serialización de los listados: `/classes/`, `/promotions/` y `/products/`.
+
+Para cada listado arma una app FastAPI mínima con el mismo `response_model`
+y los mismos modelos del servicio, con un endpoint que construye la
+respuesta igual que el servicio real (`SuccessResponse(data=...)` o una
+lista de `ProductResponse`) a partir de documentos sintéticos, y la llama
+directamente como aplicación ASGI. Se comparan tres variantes:
+
+    json        APIRoute + JSONResponse (lo que había)
+    orjson      APIRoute + ORJSONResponse
+    fast path   ModelResponseRoute + ORJSONResponse (lo que usan ahora los servicios)
+
+Uso:
+    python benchmarks/json_responses.py
+    python benchmarks/json_responses.py --items 500 --image-kb 30 --requests 200
+
+No necesita Firestore ni el Config-Server: solo importa los modelos y
+`app/utils/response_route.py` de cada servicio.
+"""
+import argparse
+import asyncio
+import base64
+import importlib
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_service(service: str, *modules: str) -> list:
+    # Cada servicio tiene su propio paquete `app`: se descarga el anterior antes de importar
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    sys.path.insert(0, str(SERVER_DIR / service))
+    try:
+        return [importlib.import_module(m) for m in modules]
+    finally:
+        sys.path.pop(0)
+
+
+def class_docs(n: int) -> list:
+    start = datetime(2025, 6, 1, 9, 0)
+    return [
+        {
+            "id": f"class-{i:05d}",
+            "name": f"Yoga Avanzado {i}",
+            "description": "Clase de yoga para practicantes avanzados",
+            "instructor": "Ana López",
+            "start_time": start + timedelta(hours=i),
+            "end_time": start + timedelta(hours=i, minutes=90),
+            "capacity": 20,
+            "location": "Sala 1",
+            "status": True,
+        }
+        for i in range(n)
+    ]
+
+
+def promotion_docs(n: int) -> list:
+    return [
+        {
+            "id": f"promo-{i:05d}",
+            "name": f"Promo Especial {i}",
+            "description": "Descuento del 10% en todas las membresías",
+            "start_date": "2025-06-01",
+            "end_date": "2025-06-30",
+            "discount_type": "percentage",
+            "discount_value": 10,
+            "applicable_to": "new_users",
+            "auto_apply": False,
+            "promo_code": f"VERANO{i}",
+            "status": True,
+        }
+        for i in range(n)
+    ]
+
+
+def product_docs(n: int, image_kb: int) -> list:
+    image = base64.b64encode(os.urandom(image_kb * 768)).decode()
+    return [
+        {
+            "id": f"prod-{i:05d}",
+            "name": f"Proteína Whey {i}",
+            "sku": f"PROT-{i:05d}",
+            "category": "suplementos",
+            "description": "Proteína de suero de leche isolate, sabor vainilla",
+            "purchase_price": "25.99",
+            "sale_price": "39.99",
+            "current_stock": 50,
+            "min_stock": 10,
+            "expiration_date": date.today() + timedelta(days=365),
+            "supplier_id": "SUP-001",
+            "barcode": "123456789012",
+            "status": "activo",
+            "image_base64": image,
+            "created_at": date(2023, 6, 12),
+            "last_updated": date(2023, 6, 15),
+            "profit_margin": 53.8,
+        }
+        for i in range(n)
+    ]
+
+
+def list_endpoints(items: int, image_kb: int) -> list:
+    """(nombre, response_model, función que arma la respuesta, ModelResponseRoute del servicio)"""
+    endpoints = []
+
+    standardization, route = load_service(
+        "class-service", "app.utils.response_standardization", "app.utils.response_route"
+    )
+    docs = class_docs(items)
+    endpoints.append((
+        "/classes/", standardization.SuccessResponse,
+        lambda m=standardization.SuccessResponse, d=docs: m(data=d),
+        route.ModelResponseRoute,
+    ))
+
+    standardization, route = load_service(
+        "promotions-service", "app.utils.response_standardization", "app.utils.response_route"
+    )
+    docs = promotion_docs(items)
+    endpoints.append((
+        "/promotions/", standardization.SuccessResponse,
+        lambda m=standardization.SuccessResponse, d=docs: m(data=d),
+        route.ModelResponseRoute,
+    ))
+
+    product_model, route = load_service("shop-service", "app.models.product_model", "app.utils.response_route")
+    docs = product_docs(items, image_kb)
+    endpoints.append((
+        "/products/", List[product_model.ProductResponse],
+        lambda m=product_model.ProductResponse, d=docs: [m(**doc) for doc in d],
+        route.ModelResponseRoute,
+    ))
+    return endpoints
+
+
+def build_app(response_model, build_response, route_class, response_class) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/", response_model=response_model)
+    async def list_items():
+        return build_response()
+
+    app = FastAPI(default_response_class=response_class)
+    app.include_router(router)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, repeat: int, headers: dict = None):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")] + [
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()
+        ],
+        "client": ("10.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(dict(scope), receive, send)
+    size = len(body)
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        rounds.append((time.perf_counter() - start) / requests * 1000)
+    return statistics.median(rounds), size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200, help="documentos por listado")
+    parser.add_argument("--image-kb", type=int, default=20, help="tamaño de la imagen base64 de cada producto")
+    parser.add_argument("--requests", type=int, default=50, help="peticiones por ronda")
+    parser.add_argument("--repeat", type=int, default=5, help="rondas por variante (se toma la mediana)")
+    args = parser.parse_args()
+
+    async def run():
+        results = []
+        for path, response_model, build_response, fast_route in list_endpoints(args.items, args.image_kb):
+            variants = [
+                ("json", APIRoute, JSONResponse),
+                ("orjson", APIRoute, ORJSONResponse),
+                ("fast path", fast_route, ORJSONResponse),
+            ]
+            for name, route_class, response_class in variants:
+                app = build_app(response_model, build_response, route_class, response_class)
+                millis, size = await measure(app, args.requests, args.repeat)
+                results.append((path, name, millis, size))
+        return results
+
+    results = asyncio.run(run())
+    print(f"\n{args.items} documentos por listado, {args.requests} peticiones x {args.repeat} rondas\n")
+    print(f"  {'endpoint':<14} {'variante':<10} {'ms/petición':>12} {'vs json':>8} {'KB':>9}")
+    baseline = {}
+    for path, name, millis, size in results:
+        baseline.setdefault(path, millis)
+        print(f"  {path:<14} {name:<10} {millis:12.2f} {baseline[path] / millis:7.1f}x {size / 1024:9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# benchmarks/middleware_stack.py
+"""
+Micro-benchmark de la pila de middlewares: cuánto agrega cada capa por petición.
+
+Arma una app FastAPI mínima (un GET que devuelve "ok") y la llama
+directamente como aplicación ASGI, sin red ni servidor, con distintas capas
+encima. Para cada variante muestra el tiempo medio por petición y el costo
+extra respecto de la app sin middlewares. Se comparan las versiones
+anteriores (`BaseHTTPMiddleware` y `@app.middleware("http")`, reproducidas
+aquí) con los middlewares ASGI puros del servicio.
+
+Uso:
+    python benchmarks/middleware_stack.py                       # class-service
+    python benchmarks/middleware_stack.py --service auth-service --requests 20000
+
+`AuthMiddleware` solo se mide en los servicios que lo tienen y si se puede
+importar (lee la configuración del Config-Server al importar, igual que
+`benchmarks/import_time.py`); se mide por el camino de una petición sin
+cookie, que es el costo que pagan todas las rutas públicas.
+"""
+import argparse
+import asyncio
+import importlib
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+class EmptyHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class EmptyASGIMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+def legacy_rate_limit(rate_limit):
+    # Lo que hacía el middleware antes: la misma consulta al limitador, dentro de BaseHTTPMiddleware
+    class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            bucket, max_requests, window_seconds = rate_limit._limit_for(rate_limit, request.url.path, request.method)
+            decision = await rate_limit.limiter.acquire(f"{bucket}|{request.client.host}", max_requests, window_seconds)
+            if not decision.allowed:
+                return PlainTextResponse("Rate limit exceeded.", status_code=429)
+            return await call_next(request)
+
+    return LegacyRateLimitMiddleware
+
+
+def legacy_security_headers(headers: dict):
+    async def security_headers(request, call_next):
+        response = await call_next(request)
+        response.headers.update(dict(headers))
+        return response
+
+    return security_headers
+
+
+def build_app(layers: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("ok")
+
+    # El primero de la lista queda más afuera, como en los main.py (se agregan de adentro hacia afuera)
+    for layer in reversed(layers):
+        if callable(layer) and not isinstance(layer, type):
+            app.middleware("http")(layer)
+        else:
+            app.add_middleware(layer)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, repeat: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"accept", b"*/*")],
+        "client": ("10.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    # Calentamiento: la pila de middlewares se arma en la primera llamada
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        rounds.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(rounds)
+
+
+def load_layers(service: str) -> list:
+    sys.path.insert(0, str(SERVER_DIR / service))
+    rate_limit = importlib.import_module("app.middleware.rate_limit_middleware").RateLimitMiddleware
+    security = importlib.import_module("app.middleware.security_headers_middleware")
+    # Límite alto para que ninguna petición del benchmark reciba 429
+    rate_limit.configure({"rate_limit": {"max_requests": 10**9}})
+
+    variants = [
+        ("sin middlewares", []),
+        ("BaseHTTPMiddleware vacío", [EmptyHTTPMiddleware]),
+        ("ASGI vacío", [EmptyASGIMiddleware]),
+        ("security_headers (@app.middleware)", [legacy_security_headers(security.SECURITY_HEADERS)]),
+        ("SecurityHeadersMiddleware (ASGI)", [security.SecurityHeadersMiddleware]),
+        ("RateLimit (BaseHTTPMiddleware)", [legacy_rate_limit(rate_limit)]),
+        ("RateLimitMiddleware (ASGI)", [rate_limit]),
+    ]
+    legacy_stack = [legacy_security_headers(security.SECURITY_HEADERS), legacy_rate_limit(rate_limit)]
+    stack = [security.SecurityHeadersMiddleware, rate_limit]
+
+    auth_path = SERVER_DIR / service / "app" / "middleware" / "auth_middleware.py"
+    if auth_path.exists() and "class AuthMiddleware" in auth_path.read_text(encoding="utf-8"):
+        try:
+            auth = importlib.import_module("app.middleware.auth_middleware").AuthMiddleware
+            variants.append(("AuthMiddleware (ASGI, sin cookie)", [auth]))
+            # El AuthMiddleware anterior era una capa BaseHTTPMiddleware que no hacía nada sin cookie
+            legacy_stack.insert(1, EmptyHTTPMiddleware)
+            stack.insert(1, auth)
+        except Exception as e:
+            print(f"⚠️  AuthMiddleware no se mide: {e!r}")
+
+    variants.append(("pila anterior", legacy_stack))
+    variants.append(("pila ASGI", stack))
+    return variants
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", default="class-service")
+    parser.add_argument("--requests", type=int, default=5000, help="peticiones por ronda")
+    parser.add_argument("--repeat", type=int, default=5, help="rondas por variante (se toma la mediana)")
+    args = parser.parse_args()
+
+    variants = load_layers(args.service)
+
+    async def run():
+        return [(name, await measure(build_app(layers), args.requests, args.repeat)) for name, layers in variants]
+
+    results = asyncio.run(run())
+    baseline = results[0][1]
+    print(f"\n{args.service}: {args.requests} peticiones x {args.repeat} rondas\n")
+    print(f"  {'variante':<38} {'µs/petición':>12} {'extra':>10}")
+    for name, micros in results:
+        print(f"  {name:<38} {micros:12.1f} {micros - baseline:+10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
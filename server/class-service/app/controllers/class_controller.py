@@ -4,9 +4,10 @@ from app.models.dtos.class_dto import ClassDTO
 from app.services.class_service import ClassService
 from app.utils.response_standardization import SuccessResponse, StandardResponse
 from app.services.auth_service import AuthService
+from app.utils.response_route import ModelResponseRoute
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
@@ -1,25 +1,17 @@
 # app/utils/keycloak_config.py
 
-from app.config_loader import fetch_config, decrypt_value
+from app.config_loader import fetch_config
 
-cfg = fetch_config().get("keycloak", {})
-def _strip_and_decrypt(field_name: str) -> str:
-    raw = cfg.get(field_name, "")
+# 1) Sección "keycloak", con los valores {cipher} ya descifrados en un solo round trip
+cfg = fetch_config(decrypt=True).get("keycloak", {})
 
-    if raw.startswith("{cipher}"):
-        token = raw[len("{cipher}"):]
-        plain = decrypt_value(token)
-   
-        return plain
-    return raw
-
-# 2) Extrae y desencripta los valores cifrados
+# 2) Extrae los valores
 server_url    = cfg["url"].rstrip("/")
 realm         = cfg["realm"]
 client_id     = cfg["client_id"]
-client_secret = _strip_and_decrypt("client_secret")
+client_secret = cfg.get("client_secret", "")
 admin_user    = cfg.get("username", "admin")
-admin_pass    = _strip_and_decrypt("password")
+admin_pass    = cfg.get("password", "")
 
 # 3) Inicializa KeycloakAdmin
 from keycloak import KeycloakAdmin, KeycloakOpenID
@@ -0,0 +1,35 @@
+# app/commit_watch.py
+import asyncio
+
+
+class CommitWatcher:
+    """
+    Publica la versión vigente del repo de configuración (cambia con cada
+    commit nuevo en cualquier ref) y despierta a los long-polls de `/watch`
+    cuando cambia. Debe usarse desde el event loop.
+    """
+
+    def __init__(self, commit: str):
+        self.commit = commit
+        self._changed = asyncio.Event()
+
+    def publish(self, commit: str) -> None:
+        if commit == self.commit:
+            return
+        self.commit = commit
+        # Cada cambio usa un Event nuevo: los que esperaban el anterior despiertan
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, since: str, timeout: float) -> bool:
+        """
+        Espera hasta que el commit deje de ser `since` o venza `timeout`.
+        Devuelve True si hubo cambio.
+        """
+        if self.commit != since:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
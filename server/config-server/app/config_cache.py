@@ -0,0 +1,51 @@
+# app/config_cache.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class ConfigCache:
+    """
+    Caché de configuraciones ya resueltas, con la respuesta JSON pre-serializada.
+
+    - La clave es `(app, profile, label, decrypt)`.
+    - Cada entrada recuerda el commit del que salió: si el repo avanza, la
+      siguiente lectura la recalcula.
+    - El ETag es un hash del contenido, así un commit que no toca el archivo
+      de un servicio no invalida sus revalidaciones.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple[str, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: tuple, commit: str, loader: Callable[[], Optional[dict]]):
+        """
+        Devuelve `(etag, body)` o None si `loader` no encuentra la configuración.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == commit:
+                self._entries.move_to_end(key)
+                return entry[1], entry[2]
+
+        data = loader()
+        if data is None:
+            return None
+
+        body = json.dumps(data, default=str, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+        with self._lock:
+            self._entries[key] = (commit, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag, body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,171 @@
+# app/git_sync.py
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import yaml
+from git import Repo
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+SHA_PATTERN = re.compile(r"^[0-9a-f]{7,40}$")
+
+
+class Snapshot(NamedTuple):
+    commit: str           # commit de la rama por defecto
+    refs: dict            # rama/tag -> commit
+    version: str          # cambia si se mueve cualquier ref
+
+
+class ConfigRepository:
+    """
+    Repo de configuración servido directamente desde los objetos de git.
+
+    - Cualquier label (rama, tag o commit) se resuelve a un commit y sus YAML
+      se leen como blobs, sin checkout: varias versiones conviven en el mismo
+      proceso (por ejemplo réplicas canary fijadas a otra rama).
+    - Los archivos ya parseados se guardan en una caché LRU por commit; un
+      commit es inmutable, así que nunca hay que invalidarla.
+    - La sincronización con el remoto corre en segundo plano y publica el nuevo
+      mapa de refs con una sola asignación de `snapshot`.
+    """
+
+    def __init__(
+        self,
+        git_url: str,
+        clone_path: Path,
+        branch: Optional[str] = None,
+        default_directory: str = "main",
+        max_commits: int = 32,
+    ):
+        self.git_url = git_url
+        self.clone_path = clone_path
+        self.branch = branch
+        self.default_directory = default_directory
+        self.max_commits = max_commits
+        self.snapshot: Optional[Snapshot] = None
+        self._repo: Optional[Repo] = None        # lecturas, bajo `_git_lock`
+        self._sync_repo: Optional[Repo] = None   # clon y fetch
+        self._lock = asyncio.Lock()
+        # El acceso a la base de objetos de GitPython no es thread-safe
+        self._git_lock = threading.Lock()
+        self._trees: "OrderedDict[str, dict]" = OrderedDict()
+        self._commits: "OrderedDict[str, str]" = OrderedDict()   # sha abreviado -> completo
+
+    # ---------- Sincronización ----------
+
+    async def load_local(self) -> Optional[Snapshot]:
+        """
+        Publica lo que ya hay en el clon local, sin tocar la red.
+        """
+        if not self.clone_path.exists():
+            return None
+        return await self._run(fetch=False)
+
+    async def sync(self) -> Optional[Snapshot]:
+        """
+        Trae cambios del remoto (clonando si hace falta) y publica las refs nuevas.
+        """
+        return await self._run(fetch=True)
+
+    async def _run(self, fetch: bool) -> Optional[Snapshot]:
+        # Single-flight: /refresh y la sincronización periódica no se pisan
+        async with self._lock:
+            snapshot = await run_in_threadpool(self._sync_blocking, fetch)
+            if self.snapshot is None or snapshot.version != self.snapshot.version:
+                self.snapshot = snapshot
+                logger.info("Configuración en el commit %s (%d refs)", snapshot.commit, len(snapshot.refs))
+            return self.snapshot
+
+    def _sync_blocking(self, fetch: bool) -> Snapshot:
+        # Clon y fetch usan su propio Repo y van fuera de `_git_lock`: las lecturas
+        # de configuración no esperan a la red, solo a la lectura de las refs.
+        # `_run` garantiza que nunca hay dos sincronizaciones a la vez.
+        if self._sync_repo is None:
+            if self.clone_path.exists():
+                self._sync_repo = Repo(str(self.clone_path))
+            else:
+                self._sync_repo = Repo.clone_from(self.git_url, str(self.clone_path), no_checkout=True)
+        if fetch:
+            self._sync_repo.remotes.origin.fetch(prune=True, tags=True)
+
+        with self._git_lock:
+            if self._repo is None:
+                self._repo = Repo(str(self.clone_path))
+            repo = self._repo
+
+            refs = {}
+            for ref in repo.remotes.origin.refs:
+                if ref.remote_head != "HEAD":
+                    refs[ref.remote_head] = ref.commit.hexsha
+            for tag in repo.tags:
+                refs.setdefault(tag.name, tag.commit.hexsha)
+
+            branch = self.branch or repo.active_branch.name
+            commit = refs[branch]
+            # Tras un fetch un sha abreviado puede volverse ambiguo o existir recién ahora
+            if fetch:
+                self._commits.clear()
+
+        version = hashlib.sha1(repr(sorted(refs.items())).encode()).hexdigest()
+        return Snapshot(commit, refs, version)
+
+    # ---------- Lectura ----------
+
+    def resolve(self, snapshot: Snapshot, label: str):
+        """
+        Devuelve `(commit, directorios)` donde buscar los archivos de `label`:
+
+        - rama o tag: su commit, en `label/`, `default_directory/` o la raíz
+        - commit (sha completo o abreviado): ese commit, en `default_directory/` o la raíz
+        - cualquier otro valor: directorio `label/` de la rama por defecto
+          (estructura histórica, un directorio por label)
+        """
+        if label in snapshot.refs:
+            return snapshot.refs[label], tuple(dict.fromkeys((label, self.default_directory, "")))
+        if SHA_PATTERN.match(label):
+            commit = self._resolve_sha(label)
+            if commit:
+                return commit, (self.default_directory, "")
+        return snapshot.commit, (label,)
+
+    def _resolve_sha(self, label: str) -> Optional[str]:
+        # Solo se cachean los aciertos: un commit que aún no llegó puede aparecer en el próximo fetch
+        with self._git_lock:
+            commit = self._commits.get(label)
+            if commit is not None:
+                return commit
+            try:
+                commit = self._repo.commit(label).hexsha
+            except Exception:
+                return None
+            self._commits[label] = commit
+            while len(self._commits) > 1024:
+                self._commits.popitem(last=False)
+            return commit
+
+    def read_yaml(self, commit: str, path: str):
+        """
+        YAML parseado de `path` en `commit`, o None si el archivo no existe.
+        """
+        with self._git_lock:
+            tree = self._trees.get(commit)
+            if tree is None:
+                tree = self._trees[commit] = {}
+                while len(self._trees) > self.max_commits:
+                    self._trees.popitem(last=False)
+            self._trees.move_to_end(commit)
+
+            if path not in tree:
+                try:
+                    blob = self._repo.commit(commit).tree / path
+                    tree[path] = yaml.safe_load(blob.data_stream.read())
+                except KeyError:
+                    tree[path] = None
+            return tree[path]
@@ -1,23 +1,67 @@
 # app/main.py
+import asyncio
+import logging
 import os
-from fastapi import FastAPI, HTTPException, Body, Depends, Request
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Body, Depends, Request, Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from git import Repo
+from starlette.concurrency import run_in_threadpool
 import yaml
 from cryptography.fernet import Fernet
 from pathlib import Path
+from app.config_cache import ConfigCache
+from app.commit_watch import CommitWatcher
+from app.git_sync import ConfigRepository, Snapshot
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
-security = HTTPBasic()
-
-# 1) Clona o hace pull del repo con tus YAMLs
+# 1) Repo con tus YAMLs: se clona y sincroniza en segundo plano, sin bloquear el arranque
 GIT_URL     = os.getenv("CONFIG_GIT_URL")
 CLONE_PATH  = Path("/tmp/config-repo")
-if CLONE_PATH.exists():
-    Repo(str(CLONE_PATH)).remotes.origin.pull()
-else:
-    Repo.clone_from(GIT_URL, str(CLONE_PATH))
+config_repo = ConfigRepository(
+    GIT_URL,
+    CLONE_PATH,
+    branch=os.getenv("CONFIG_GIT_BRANCH"),
+    max_commits=int(os.getenv("CONFIG_COMMIT_CACHE_SIZE", 32)),
+)
+SYNC_INTERVAL_SECONDS = float(os.getenv("CONFIG_SYNC_INTERVAL", 30))
+
+# Configuraciones ya resueltas, invalidadas por el commit publicado
+config_cache = ConfigCache(max_entries=int(os.getenv("CONFIG_CACHE_SIZE", 256)))
+
+# Versión vigente de las refs, para despertar a los clientes de /watch cuando cambia
+commit_watcher = CommitWatcher("")
+WATCH_MAX_TIMEOUT   = float(os.getenv("WATCH_MAX_TIMEOUT", 60))
+
+async def _sync_loop():
+    # Primero lo que ya haya en disco (sin red), luego fetch periódico con backoff
+    try:
+        snapshot = await config_repo.load_local()
+        if snapshot:
+            commit_watcher.publish(snapshot.version)
+    except Exception:
+        logger.exception("No pude cargar el clon local de configuración")
+
+    delay = SYNC_INTERVAL_SECONDS
+    while True:
+        try:
+            snapshot = await config_repo.sync()
+            commit_watcher.publish(snapshot.version)
+            delay = SYNC_INTERVAL_SECONDS
+        except Exception:
+            logger.exception("Falló la sincronización del repo de configuración")
+            delay = min(delay * 2, 300) if config_repo.snapshot else 5
+        await asyncio.sleep(delay)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sync_task = asyncio.create_task(_sync_loop())
+    yield
+    sync_task.cancel()
+
+app = FastAPI(lifespan=lifespan)
+security = HTTPBasic()
 
 # 2) Inicializa cifrado simétrico
 KEY         = os.getenv("ENCRYPT_KEY")         # e.g. Fernet.generate_key().decode()
@@ -70,29 +114,145 @@ async def decrypt(request: Request):
     except Exception:
         raise HTTPException(400, "Bad cipher")
 
+@app.post("/decrypt/batch", dependencies=[Depends(check_auth)])
+async def decrypt_batch(body: dict = Body(...)):
+    """
+    Acepta JSON {"ciphers": ["...", ...]} y devuelve {"plains": [...]} en el
+    mismo orden, para que un servicio descifre toda su configuración en un
+    solo round trip.
+    """
+    ciphers = body.get("ciphers")
+    if not isinstance(ciphers, list) or not ciphers:
+        raise HTTPException(400, "Empty cipher list")
+
+    plains = []
+    for i, cipher in enumerate(ciphers):
+        try:
+            plains.append(fernet.decrypt(str(cipher).encode()).decode())
+        except Exception:
+            raise HTTPException(400, f"Bad cipher at index {i}")
+    return {"plains": plains}
+
+def _decrypt_tree(data):
+    if isinstance(data, dict):
+        return {k: _decrypt_tree(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_decrypt_tree(v) for v in data]
+    if isinstance(data, str) and data.startswith("{cipher}"):
+        try:
+            return fernet.decrypt(data[len("{cipher}"):].encode()).decode()
+        except Exception:
+            raise HTTPException(500, "Bad cipher in configuration")
+    return data
+
 # 4) Endpoint de configuración: /{app}/{profile}
-@app.get("/{app_name}/{profile}", dependencies=[Depends(check_auth)])
-def get_config(app_name: str, profile: str, label: str = "main"):
+def _current_snapshot() -> Snapshot:
+    snapshot = config_repo.snapshot
+    if snapshot is None:
+        raise HTTPException(503, "Configuration not ready")
+    return snapshot
+
+def _resolve_config(app_name: str, profile: str, label: str, decrypt: bool, snapshot: Snapshot):
     """
+    `label` puede ser una rama, un tag o un commit (ver `ConfigRepository.resolve`).
+
     Fallback:
       1) {app_name}-{profile}.yml
       2) {app_name}.yml
       3) application-{profile}.yml
       4) application.yml
+
+    Devuelve `(etag, body)` desde la caché, o None si no hay configuración.
+    """
+    commit, directories = config_repo.resolve(snapshot, label)
+
+    def load():
+        candidates = [
+            f"{app_name}-{profile}.yml",
+            f"{app_name}.yml",
+            f"application-{profile}.yml",
+            "application.yml"
+        ]
+        for fn in candidates:
+            for directory in directories:
+                data = config_repo.read_yaml(commit, f"{directory}/{fn}" if directory else fn)
+                if data is not None:
+                    return _decrypt_tree(data) if decrypt else data
+        return None
+
+    return config_cache.get_or_load((app_name, profile, label, decrypt), commit, load)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Comparación débil de `If-None-Match` (RFC 9110): lista separada por comas
+    de entity tags completos, con o sin prefijo `W/`, o `*`.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+@app.get("/{app_name}/{profile}", dependencies=[Depends(check_auth)])
+def get_config(request: Request, app_name: str, profile: str, label: str = "main", decrypt: bool = False):
+    """
+    Con `?decrypt=true` los valores `{cipher}…` se devuelven ya descifrados.
+    La respuesta lleva un ETag; con `If-None-Match` se responde 304 sin cuerpo.
     """
-    candidates = [
-        f"{app_name}-{profile}.yml",
-        f"{app_name}.yml",
-        f"application-{profile}.yml",
-        "application.yml"
-    ]
-    for fn in candidates:
-        path = CLONE_PATH / label / fn
-        if path.exists():
-            data = yaml.safe_load(path.read_text())
-            # aquí podrías, si quieres, descifrar automáticamente valores que estén marcados
-            return data
-    raise HTTPException(404, "Configuration not found")
+    resolved = _resolve_config(app_name, profile, label, decrypt, _current_snapshot())
+    if resolved is None:
+        raise HTTPException(404, "Configuration not found")
+
+    etag, body = resolved
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# 5) Long-poll de cambios: /watch/{app}/{profile}
+@app.get("/watch/{app_name}/{profile}", dependencies=[Depends(check_auth)])
+async def watch_config(
+    app_name: str,
+    profile: str,
+    label: str = "main",
+    etag: str = "",
+    timeout: float = 30,
+):
+    """
+    Responde en cuanto la configuración de `(app, profile)` deja de tener el
+    ETag `etag`: 200 con la nueva configuración y su ETag. Si no cambia en
+    `timeout` segundos responde 304 y el cliente vuelve a preguntar.
+    """
+    deadline = time.monotonic() + min(max(timeout, 0), WATCH_MAX_TIMEOUT)
+    while True:
+        snapshot = _current_snapshot()
+        resolved = await run_in_threadpool(_resolve_config, app_name, profile, label, False, snapshot)
+        if resolved is None:
+            raise HTTPException(404, "Configuration not found")
+
+        current_etag, body = resolved
+        if not _etag_matches(etag, current_etag):
+            return Response(content=body, media_type="application/json", headers={"ETag": current_etag})
+
+        # Un commit que no toca este archivo no cambia el ETag: se sigue esperando
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not await commit_watcher.wait_for_change(snapshot.version, remaining):
+            return Response(status_code=304, headers={"ETag": current_etag})
+
+# 6) Sincronización inmediata con el remoto (por ejemplo desde un webhook)
+@app.post("/refresh", dependencies=[Depends(check_auth)])
+async def refresh():
+    try:
+        snapshot = await config_repo.sync()
+    except Exception:
+        logger.exception("Falló /refresh")
+        raise HTTPException(502, "Git sync failed")
+    commit_watcher.publish(snapshot.version)
+    return {"commit": snapshot.commit}
 
 @app.get("/health")
 async def health():
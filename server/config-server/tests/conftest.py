@@ -0,0 +1,40 @@
+# tests/conftest.py
+import os
+import subprocess
+
+import pytest
+from cryptography.fernet import Fernet
+
+# app.main lee esto al importarse
+os.environ.setdefault("ENCRYPT_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("CFG_USER", "config")
+os.environ.setdefault("CFG_PWD", "secret")
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@ezto.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def commit_file(origin, path: str, content: str) -> str:
+    target = origin / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content)
+    git(origin, "add", path)
+    git(origin, "commit", "-q", "-m", f"update {path}")
+    return git(origin, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """
+    Repo remoto de prueba: rama main con main/auth-dev.yml y el tag v1.
+    """
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    git(origin, "init", "-q", "-b", "main")
+    commit_file(origin, "main/auth-dev.yml", "port: 8000\n")
+    git(origin, "tag", "v1")
+    return origin
@@ -0,0 +1,38 @@
+from app.config_cache import ConfigCache
+
+
+# Con el mismo commit la configuración sale de la caché sin volver a cargarla
+def test_hit_reuses_body_until_commit_changes():
+    cache = ConfigCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"port": 8000}
+
+    first = cache.get_or_load(("auth", "dev", "main", False), "c1", loader)
+    second = cache.get_or_load(("auth", "dev", "main", False), "c1", loader)
+    third = cache.get_or_load(("auth", "dev", "main", False), "c2", loader)
+
+    assert first == second == third
+    assert first[1] == b'{"port":8000}'
+    assert len(loads) == 2
+
+
+# Llena, la caché descarta la entrada usada hace más tiempo
+def test_evicts_least_recently_used():
+    cache = ConfigCache(max_entries=2)
+    cache.get_or_load("a", "c1", lambda: {"a": 1})
+    cache.get_or_load("b", "c1", lambda: {"b": 1})
+    cache.get_or_load("a", "c1", lambda: {"a": 2})
+    cache.get_or_load("c", "c1", lambda: {"c": 1})
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.get_or_load("a", "c1", lambda: {"a": 2})[1] == b'{"a":1}'
+
+
+# Si no hay configuración no se cachea nada
+def test_missing_config_is_not_cached():
+    cache = ConfigCache()
+    assert cache.get_or_load("a", "c1", lambda: None) is None
+    assert cache.get_or_load("a", "c1", lambda: {"a": 1}) is not None
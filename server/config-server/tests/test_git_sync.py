@@ -0,0 +1,42 @@
+import asyncio
+
+from app.git_sync import ConfigRepository
+from conftest import commit_file, git
+
+
+def _synced(origin, tmp_path) -> ConfigRepository:
+    repo = ConfigRepository(str(origin), tmp_path / "clone", branch="main")
+    asyncio.run(repo.sync())
+    return repo
+
+
+# Rama, tag y sha (completo o abreviado) se resuelven a su commit
+def test_resolve_branch_tag_and_sha(origin, tmp_path):
+    repo = _synced(origin, tmp_path)
+    snapshot = repo.snapshot
+    head = git(origin, "rev-parse", "HEAD")
+
+    assert repo.resolve(snapshot, "main") == (head, ("main", ""))
+    assert repo.resolve(snapshot, "v1") == (head, ("v1", "main", ""))
+    assert repo.resolve(snapshot, head) == (head, ("main", ""))
+    assert repo.resolve(snapshot, head[:7]) == (head, ("main", ""))
+    assert repo.read_yaml(head, "main/auth-dev.yml") == {"port": 8000}
+
+
+# Un label desconocido apunta a su directorio en la rama por defecto
+def test_resolve_unknown_label(origin, tmp_path):
+    repo = _synced(origin, tmp_path)
+    snapshot = repo.snapshot
+
+    assert repo.resolve(snapshot, "canary") == (snapshot.commit, ("canary",))
+    assert repo.resolve(snapshot, "deadbeef") == (snapshot.commit, ("deadbeef",))
+
+
+# Un sha que aún no llegó no queda cacheado: tras el fetch se resuelve
+def test_unknown_sha_resolves_after_fetch(origin, tmp_path):
+    repo = _synced(origin, tmp_path)
+    new_commit = commit_file(origin, "main/auth-dev.yml", "port: 9000\n")
+
+    assert repo.resolve(repo.snapshot, new_commit[:10])[0] != new_commit
+    asyncio.run(repo.sync())
+    assert repo.resolve(repo.snapshot, new_commit[:10]) == (new_commit, ("main", ""))
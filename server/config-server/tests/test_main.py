@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import main
+from app.commit_watch import CommitWatcher
+from app.config_cache import ConfigCache
+from app.git_sync import ConfigRepository
+from conftest import commit_file
+
+AUTH = ("config", "secret")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"abc"', True),
+    ("*", True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('"xyz","abc"', True),
+    ('"ab"', False),
+    ('"abcd"', False),
+    ('"xyz", "other"', False),
+    ("", False),
+])
+def test_etag_matches(header, expected):
+    assert main._etag_matches(header, '"abc"') is expected
+
+
+@pytest.fixture
+def served(origin, tmp_path, monkeypatch):
+    """
+    El app apuntando al repo de prueba, sin el bucle de sincronización.
+    """
+    repo = ConfigRepository(str(origin), tmp_path / "clone", branch="main")
+    monkeypatch.setattr(main, "config_repo", repo)
+    monkeypatch.setattr(main, "config_cache", ConfigCache())
+    return repo
+
+
+def _client():
+    transport = httpx.ASGITransport(app=main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test", auth=AUTH)
+
+
+# If-None-Match con el ETag vigente responde 304 sin cuerpo
+def test_get_config_not_modified(served):
+    async def scenario():
+        await served.sync()
+        async with _client() as client:
+            response = await client.get("/auth/dev")
+            assert response.status_code == 200
+            assert response.json() == {"port": 8000}
+            etag = response.headers["ETag"]
+
+            response = await client.get("/auth/dev", headers={"If-None-Match": f"W/{etag}"})
+            assert response.status_code == 304
+            assert response.content == b""
+
+    asyncio.run(scenario())
+
+
+# /watch responde en cuanto un commit cambia la configuración
+def test_watch_returns_on_commit_change(served, origin, monkeypatch):
+    async def scenario():
+        watcher = CommitWatcher("")
+        monkeypatch.setattr(main, "commit_watcher", watcher)
+        watcher.publish((await served.sync()).version)
+
+        async with _client() as client:
+            etag = (await client.get("/auth/dev")).headers["ETag"]
+            watch = asyncio.create_task(
+                client.get("/watch/auth/dev", params={"etag": etag, "timeout": 10})
+            )
+            await asyncio.sleep(0.2)
+            assert not watch.done()
+
+            commit_file(origin, "main/auth-dev.yml", "port: 9000\n")
+            watcher.publish((await served.sync()).version)
+
+            response = await asyncio.wait_for(watch, 5)
+            assert response.status_code == 200
+            assert response.json() == {"port": 9000}
+            assert response.headers["ETag"] != etag
+
+    asyncio.run(scenario())
+
+
+# Sin cambios, /watch vence el timeout y responde 304
+def test_watch_times_out_with_304(served, monkeypatch):
+    async def scenario():
+        watcher = CommitWatcher("")
+        monkeypatch.setattr(main, "commit_watcher", watcher)
+        watcher.publish((await served.sync()).version)
+
+        async with _client() as client:
+            etag = (await client.get("/auth/dev")).headers["ETag"]
+            response = await client.get("/watch/auth/dev", params={"etag": etag, "timeout": 0.3})
+            assert response.status_code == 304
+            assert response.headers["ETag"] == etag
+
+    asyncio.run(scenario())
@@ -0,0 +1,330 @@
+# app/utils/rate_limiter.py
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float   # segundos hasta que vuelva a haber cupo (0 si se permitió)
+
+
+def _advance(start: float, current: int, previous: int, now: float, window: float):
+    # Avanza la ventana: la actual pasa a ser la anterior (o se vacía si hubo un hueco)
+    if now - start >= window:
+        elapsed_windows = int((now - start) // window)
+        previous = current if elapsed_windows == 1 else 0
+        current = 0
+        start += elapsed_windows * window
+    return start, current, previous
+
+
+def _decide(start: float, current: int, previous: int, now: float, window: float, limit: int) -> RateLimitDecision:
+    # Estimación de lo pedido en los últimos `window` segundos (sin contar esta petición)
+    estimated = previous * (1 - (now - start) / window) + current
+    if estimated + 1 > limit:
+        # Cupo nuevo cuando el peso de la ventana anterior haya bajado lo suficiente
+        if previous:
+            retry_after = min((estimated + 1 - limit) / previous * window, start + window - now)
+        else:
+            retry_after = start + window - now
+        return RateLimitDecision(False, 0, max(retry_after, 0.0))
+    return RateLimitDecision(True, max(int(limit - estimated - 1), 0), 0.0)
+
+
+class SlidingWindowLimiter:
+    """
+    Limitador de ventana deslizante aproximada (sliding window counter), en
+    memoria del proceso.
+
+    - Por cliente se guardan solo dos contadores, el de la ventana actual y el
+      de la anterior, y se estima lo pedido en los últimos `window` segundos
+      como `anterior * fracción_restante + actual`. Cada petición es O(1),
+      sin importar `max_requests`.
+    - Las claves viven en un OrderedDict en orden de uso (LRU): se descartan
+      las que llevan más de dos ventanas sin actividad (ya no aportan nada al
+      cálculo) y, si aun así se supera `max_entries`, las menos usadas.
+    - No es thread-safe: se usa desde el event loop.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        # clave -> [inicio de la ventana actual, cuenta actual, cuenta anterior, ventana, último uso]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    async def acquire(self, key: str, limit: int, window: float) -> RateLimitDecision:
+        return self.hit(key, limit, window)
+
+    def hit(self, key: str, limit: int, window: float, now: float = None) -> RateLimitDecision:
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [now - now % window, 0, 0, window, now]
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._entries.move_to_end(key)
+            entry[4] = now
+
+        entry[0], entry[1], entry[2] = _advance(entry[0], entry[1], entry[2], now, window)
+        decision = _decide(entry[0], entry[1], entry[2], now, window, limit)
+        if decision.allowed:
+            entry[1] += 1
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    def _evict_idle(self, now: float) -> None:
+        # Las menos usadas están al principio: se corta en la primera que sigue activa
+        entries = self._entries
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if now - entry[4] < 2 * entry[3]:
+                break
+            del entries[key]
+            self.evicted += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def close(self) -> None:
+        self.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.backend,
+            "tracked_clients": len(self._entries),
+            "max_entries": self.max_entries,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
+
+
+class SharedMemoryLimiter:
+    """
+    El mismo algoritmo, con el estado en un archivo mapeado en memoria
+    (`/dev/shm`) que comparten todos los workers de uvicorn del host.
+
+    - Tabla de tamaño fijo (`slots`): cada clave se ubica por hash con hasta
+      `PROBES` posiciones de sondeo; si están todas ocupadas se reemplaza la
+      menos reciente. La memoria nunca crece.
+    - Cada lectura-modificación-escritura va bajo `flock`, así los
+      incrementos son atómicos entre procesos.
+    - Si el archivo no se puede usar, la petición se deja pasar (fail open).
+    """
+
+    backend = "shared"
+    PROBES = 8
+    SLOT = struct.Struct("<QddII")   # hash de la clave, inicio, ventana, actual, anterior
+
+    def __init__(self, path: str, slots: int = 65536):
+        import fcntl
+        self._fcntl = fcntl
+        self.path = path
+        self.slots = slots
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.errors = 0
+
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    async def acquire(self, key: str, limit: int, window: float) -> RateLimitDecision:
+        try:
+            return self.hit(key, limit, window)
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            logger.warning("Rate limit compartido no disponible (%r), dejo pasar la petición", e)
+            return RateLimitDecision(True, limit, 0.0)
+
+    def hit(self, key: str, limit: int, window: float, now: float = None) -> RateLimitDecision:
+        # Reloj de pared: es el mismo para todos los procesos
+        now = time.time() if now is None else now
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        first = key_hash % self.slots
+
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+        try:
+            offset, start, current, previous = self._find(key_hash, first, now, window)
+            start, current, previous = _advance(start, current, previous, now, window)
+            decision = _decide(start, current, previous, now, window, limit)
+            if decision.allowed:
+                current += 1
+            self.SLOT.pack_into(self._map, offset, key_hash, start, window, current, previous)
+        finally:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    def _find(self, key_hash: int, first: int, now: float, window: float):
+        victim, victim_start = None, math.inf
+        for probe in range(self.PROBES):
+            offset = ((first + probe) % self.slots) * self.SLOT.size
+            slot_hash, start, slot_window, current, previous = self.SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, start, current, previous
+            # Libre o inactiva hace más de dos ventanas: se puede reutilizar
+            if slot_hash == 0 or now - start >= 2 * slot_window:
+                if victim_start != -math.inf:
+                    victim, victim_start = offset, -math.inf
+            elif start < victim_start:
+                victim, victim_start = offset, start
+
+        if victim_start != -math.inf:
+            self.evicted += 1
+        return victim, now - now % window, 0, 0
+
+    async def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "slots": self.slots,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "errors": self.errors,
+        }
+
+
+class RedisLimiter:
+    """
+    Contadores en cualquier servidor que hable el protocolo de Redis
+    (Redis, Valkey, KeyDB o un sustituto local), compartidos entre workers y
+    réplicas.
+
+    - Cada petición es un solo round trip: INCR del contador de la ventana
+      actual, PEXPIRE y GET de la ventana anterior van en un pipeline. INCR
+      es atómico en el servidor, así dos réplicas nunca pierden un conteo.
+    - Las peticiones rechazadas también cuentan: un cliente que insiste
+      sigue bloqueado.
+    - Si el servidor no responde se deja pasar la petición (fail open) y no
+      se lo vuelve a intentar por `cooldown` segundos, para no sumar un
+      timeout a cada request mientras está caído.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, prefix: str = "ezto:ratelimit:", timeout: float = 0.1, cooldown: float = 5):
+        import redis.asyncio as redis
+        self.url = url
+        self.prefix = prefix
+        self.cooldown = cooldown
+        self._redis = redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._down_until = 0.0
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+    async def acquire(self, key: str, limit: int, window: float) -> RateLimitDecision:
+        now = time.time()
+        if now < self._down_until:
+            self.errors += 1
+            return RateLimitDecision(True, limit, 0.0)
+
+        index = int(now // window)
+        start = index * window
+        current_key = f"{self.prefix}{key}:{index}"
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.incr(current_key)
+                pipe.pexpire(current_key, int(window * 2000))
+                pipe.get(f"{self.prefix}{key}:{index - 1}")
+                current, _, previous = await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            self._down_until = now + self.cooldown
+            logger.warning("Rate limit en %s no disponible (%r), dejo pasar peticiones por %.0f s", self.url, e, self.cooldown)
+            return RateLimitDecision(True, limit, 0.0)
+
+        # `current` ya incluye esta petición
+        decision = _decide(start, int(current) - 1, int(previous or 0), now, window, limit)
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.backend,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "failing_open": time.time() < self._down_until,
+        }
+
+
+def create_limiter(limits: dict, current=None):
+    """
+    Construye el backend indicado en `rate_limit.backend` (memory | shared | redis).
+    Si la configuración del backend no cambió se reutiliza `current`, así una
+    recarga en caliente de los límites no pierde los contadores.
+    """
+    backend = os.getenv("RATE_LIMIT_BACKEND") or limits.get("backend", "memory")
+    try:
+        if backend == "redis":
+            url = os.getenv("RATE_LIMIT_REDIS_URL") or limits.get("redis_url", "redis://localhost:6379/0")
+            if isinstance(current, RedisLimiter) and current.url == url:
+                return current
+            return RedisLimiter(url)
+
+        if backend == "shared":
+            default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = limits.get("shared_path") or os.path.join(
+                default_dir, f"{os.getenv('APP_NAME', 'service')}-ratelimit"
+            )
+            slots = int(limits.get("shared_slots", 65536))
+            if isinstance(current, SharedMemoryLimiter) and current.path == path and current.slots == slots:
+                return current
+            return SharedMemoryLimiter(path, slots)
+    except Exception:
+        logger.exception("No pude crear el backend de rate limit '%s', uso memoria local", backend)
+
+    max_entries = int(limits.get("max_clients", 100_000))
+    if isinstance(current, SlidingWindowLimiter):
+        current.max_entries = max_entries
+        return current
+    return SlidingWindowLimiter(max_entries)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
@@ -15,8 +15,9 @@ from pydantic import BaseModel, Field
 from app.services.inventory_service import InventoryService
 from app.services.auth_service import AuthService
 from app.models.inventory_model import InventoryMovement
+from app.utils.response_route import ModelResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 
 class ErrorResponse(BaseModel):
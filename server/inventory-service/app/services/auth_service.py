@@ -1,10 +1,13 @@
 # app/services/auth_service.py
+import os
+import hmac
 import logging
-import requests
 from fastapi import HTTPException, Request
 from jose import jwt, JWTError
 
 from app.config_loader import fetch_config, decrypt_value
+from app.utils.jwks_cache import JWKSKeyStore
+from app.utils.token_cache import TokenCache
 
 logger = logging.getLogger("app.services.auth_service")
 
@@ -19,29 +22,70 @@ REALM        = cfg["realm"]                      # p.ej. "master"
 JWKS_URL = f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/certs"
 ISSUER   = f"{KEYCLOAK_URL}/realms/{REALM}"
 
+# 4) Claves públicas del realm, compartidas por todo el proceso
+jwks_store = JWKSKeyStore(JWKS_URL, ttl_seconds=float(cfg.get("jwks_ttl_seconds", 600)))
+
+# 5) Tokens ya verificados: evita repetir la verificación en cada llamada
+token_cache = TokenCache(
+    max_entries=int(cfg.get("token_cache_size", 10000)),
+    ttl_seconds=float(cfg.get("token_cache_ttl_seconds", 300)),
+)
+
+# 6) Detrás de Traefik con ForwardAuth, auth-service ya verificó el token y
+#    envía la identidad en cabeceras. Como el puerto del servicio también se
+#    publica, solo se confía en ellas si llegan con el secreto compartido que
+#    Traefik agrega a cada petición (customRequestHeaders). Sin
+#    GATEWAY_SHARED_SECRET las cabeceras se ignoran.
+TRUST_GATEWAY_HEADERS = os.getenv("TRUST_GATEWAY_HEADERS", "false").lower() == "true"
+GATEWAY_SECRET_HEADER = "X-Gateway-Secret"
+GATEWAY_SHARED_SECRET = os.getenv("GATEWAY_SHARED_SECRET", "")
+if TRUST_GATEWAY_HEADERS and not GATEWAY_SHARED_SECRET:
+    logger.warning("TRUST_GATEWAY_HEADERS sin GATEWAY_SHARED_SECRET: se ignoran las cabeceras del gateway")
+
 class AuthService:
 
+    @staticmethod
+    def _from_gateway(request: Request) -> bool:
+        secret = request.headers.get(GATEWAY_SECRET_HEADER, "")
+        if not (TRUST_GATEWAY_HEADERS and GATEWAY_SHARED_SECRET and secret):
+            return False
+        return hmac.compare_digest(secret.encode(), GATEWAY_SHARED_SECRET.encode())
+
     @staticmethod
     async def get_current_user(request: Request) -> dict:
+        if request.headers.get("X-User-Id") and AuthService._from_gateway(request):
+            return {
+                "user_id": request.headers["X-User-Id"],
+                "email": request.headers.get("X-User-Email", ""),
+                "role": request.headers.get("X-User-Role", "gym_member"),
+            }
+
         auth_header = request.headers.get("Authorization", "")
         logger.debug("Received Authorization header: %r", auth_header)
         if not auth_header.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Token missing")
 
         token = auth_header.split(" ", 1)[1]
+
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
         logger.info("Verifying token…")
 
-        # 1) Descargar JWKS
+        # 1) Lee el 'kid' de la cabecera del token
         try:
-            jwks = requests.get(JWKS_URL, timeout=5).json()
+            unverified_header = jwt.get_unverified_header(token)
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        kid = unverified_header.get("kid")
+
+        # 2) Busca la clave pública en el JWKS en memoria (solo descarga si hace falta)
+        try:
+            key_dict = await jwks_store.get_key(kid)
         except Exception:
             logger.exception("No pude descargar JWKS")
             raise HTTPException(status_code=500, detail="Authentication backend error")
-
-        # 2) Busca la clave pública correcta por 'kid'
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
-        key_dict = next((k for k in jwks["keys"] if k["kid"] == kid), None)
         if not key_dict:
             logger.error("No hallé la clave JWKS para kid=%s", kid)
             raise HTTPException(status_code=401, detail="Invalid token")
@@ -67,4 +111,6 @@ class AuthService:
         # adapta esta lógica a tus roles reales
         role  = "gym_owner" if "gym_owner" in roles else "gym_member"
 
-        return {"user_id": sub, "email": email, "role": role}
+        user = {"user_id": sub, "email": email, "role": role}
+        token_cache.set(token, user, decoded.get("exp"))
+        return user
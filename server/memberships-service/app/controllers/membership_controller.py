@@ -6,9 +6,10 @@ from app.models.dtos.membership_plan_dto import MembershipPlanDTO
 from app.services.membership_service import MembershipService
 from app.utils.response_standardization import SuccessResponse, ErrorResponse, StandardResponse
 from app.services.auth_service import AuthService
+from app.utils.response_route import ModelResponseRoute
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
@@ -1,38 +1,62 @@
 # main.py (Microservicio de Membresías)
 
-from fastapi import FastAPI, Request, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
 
 from app.controllers.membership_controller import router as membership_router
 from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
+from app.middleware.compression_middleware import CompressionMiddleware
 from fastapi.exceptions import RequestValidationError
 from app.utils.exception_handlers import (
     global_exception_dispatcher,
     request_validation_exception_handler,
 )
-from app.utils.consul_register import register_service_in_consul
+from app.utils.consul_client import ConsulRegistration
+from app.utils.firebase_config import init_firebase
+from app.utils.startup import StartupOrchestrator
+from app.services.auth_service import jwks_store, token_cache
+from app.repositories.membership_repository import MembershipRepository
 
 # configuración centralizada
-from .config_loader import fetch_config, PROFILE
+from .config_loader import fetch_config, PROFILE, on_config_change, start_config_watch
 
 cfg = fetch_config()
 HOST = cfg.get("host", "0.0.0.0")
 PORT = int(cfg.get("port", 8007))
 
+# Límites de tasa desde la configuración, recargables en caliente
+RateLimitMiddleware.configure(cfg)
+on_config_change(RateLimitMiddleware.configure)
+
+
+# Dependencias que se inicializan en paralelo al arrancar
+startup = StartupOrchestrator()
+startup.step("firebase", init_firebase)
+consul = ConsulRegistration("memberships-service", PORT)
+startup.step("consul", consul.register, required=False)
+
+# Calentamiento en segundo plano: /ready se pone verde recién al terminar
+startup.warmup("jwks", jwks_store.refresh)
+startup.warmup("plans", MembershipRepository.get_all_memberships)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    register_service_in_consul("memberships-service", PORT)
+    start_config_watch()
+    await startup.run()
     yield
+    await startup.close()
+    await consul.deregister()
 
 
 app = FastAPI(
     title="Gestión de Planes de Membresía – Plataforma EzTo",
     description="Microservicio para la gestión de planes de membresía dentro del sistema EzTo.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
     root_path="/memberships-plans",
     contact={
@@ -65,32 +89,10 @@ app.add_middleware(
 app.add_middleware(RateLimitMiddleware)
 
 # Compresión GZIP para respuestas grandes
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
 
 # Encabezados de seguridad
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers.update({
-        "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",
-        "Content-Security-Policy": (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-            "img-src 'self'; "
-            "font-src 'self' https://cdnjs.cloudflare.com; "
-            "connect-src 'self'; "
-            "frame-ancestors 'self'; "
-            "form-action 'self'; "
-            "base-uri 'self';"
-        ),
-        "X-Content-Type-Options": "nosniff",
-        "X-Frame-Options": "DENY",
-        "X-XSS-Protection": "1; mode=block",
-        "Referrer-Policy": "strict-origin-when-cross-origin",
-        "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
-    })
-    return response
+app.add_middleware(SecurityHeadersMiddleware)
 
 # Hosts permitidos
 app.add_middleware(
@@ -114,7 +116,24 @@ app.include_router(
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics/rate-limit", tags=["Monitoreo"])
+def rate_limit_metrics():
+    return RateLimitMiddleware.metrics()
+
+@app.get("/metrics/compression", tags=["Monitoreo"])
+def compression_metrics():
+    return CompressionMiddleware.metrics()
+
+@app.get("/metrics/token-cache", tags=["Monitoreo"])
+def token_cache_metrics():
+    return token_cache.stats()
+
+@app.get("/ready", tags=["Monitoreo"])
+def readiness_check():
+    # 200 solo cuando las dependencias están inicializadas y el servicio ya calentó
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.status())
+
 @app.get("/config-health", tags=["Monitoreo"])
 def config_health():
-    return {"status": "up", "config_profile": PROFILE, "config": cfg}
+    return {"status": "up", "config_profile": PROFILE, "config": fetch_config()}
 
@@ -1,29 +1,112 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+# app/middleware/rate_limit_middleware.py
+
 from starlette.responses import JSONResponse
-from datetime import datetime, UTC
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.rate_limiter import SlidingWindowLimiter, create_limiter, retry_after_header
+
+class RateLimitMiddleware:
+    """
+    Middleware para limitar la tasa de peticiones por cliente (Rate Limiting).
+    max_requests: número máximo de peticiones
+    window_seconds: ventana de tiempo en segundos
+    routes: límites propios por prefijo de ruta (y opcionalmente método)
+
+    El estado vive en un limitador de ventana deslizante (O(1) por petición,
+    memoria acotada) con backend configurable: memoria del proceso, memoria
+    compartida entre los workers del host o un servidor Redis compartido
+    entre réplicas. Si el backend falla la petición pasa (fail open).
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    rate_limit = {}
+    Es middleware ASGI puro: no crea Request ni envuelve el cuerpo de la
+    respuesta, solo mira `scope` y deja pasar o responde 429.
+    """
+    limiter = SlidingWindowLimiter()
     max_requests = 100
     window_seconds = 60
+    # [(prefijo, método o None, max_requests, window_seconds)], el prefijo más largo primero
+    routes: list = []
+    # Detrás de Traefik todas las peticiones llegan desde la IP del gateway:
+    # solo con esto activo se usa la IP que el gateway agrega a X-Forwarded-For
+    trust_forwarded_for = False
+    # Rutas que no se limitan
+    exempt_paths: set = set()
+
+    @classmethod
+    def configure(cls, cfg: dict):
+        """
+        Aplica la sección `rate_limit` de la configuración. Se llama al arrancar
+        y cada vez que el Config-Server publica un cambio.
+
+            rate_limit:
+              max_requests: 100
+              window_seconds: 60
+              max_clients: 100000
+              trust_forwarded_for: false
+              backend: memory            # memory | shared | redis
+              redis_url: redis://redis:6379/0
+              shared_slots: 65536
+              routes:
+                - {path: /login, method: POST, max_requests: 10, window_seconds: 60}
+        """
+        limits = cfg.get("rate_limit") or {}
+        cls.max_requests = int(limits.get("max_requests", cls.max_requests))
+        cls.window_seconds = int(limits.get("window_seconds", cls.window_seconds))
+        cls.trust_forwarded_for = bool(limits.get("trust_forwarded_for", cls.trust_forwarded_for))
+        cls.limiter = create_limiter(limits, cls.limiter)
+
+        routes = []
+        for route in limits.get("routes") or []:
+            routes.append((
+                route["path"],
+                (route.get("method") or "").upper() or None,
+                int(route.get("max_requests", cls.max_requests)),
+                int(route.get("window_seconds", cls.window_seconds)),
+            ))
+        cls.routes = sorted(routes, key=lambda r: len(r[0]), reverse=True)
+
+    @classmethod
+    def metrics(cls) -> dict:
+        return {
+            **cls.limiter.metrics(),
+            "max_requests": cls.max_requests,
+            "window_seconds": cls.window_seconds,
+            "routes": len(cls.routes),
+        }
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _client_id(self, scope: Scope) -> str:
+        if self.trust_forwarded_for:
+            forwarded = [value for name, value in scope["headers"] if name == b"x-forwarded-for"]
+            # La entrada más a la derecha es la que agregó el proxy de confianza;
+            # las anteriores las puede inventar el cliente
+            client_ip = forwarded[-1].decode("latin-1").rsplit(",", 1)[-1].strip() if forwarded else ""
+            if client_ip:
+                return client_ip
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _limit_for(self, path: str, method: str):
+        for prefix, route_method, max_requests, window_seconds in self.routes:
+            if path.startswith(prefix) and (route_method is None or route_method == method):
+                return f"{route_method or '*'} {prefix}", max_requests, window_seconds
+        return "*", self.max_requests, self.window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        bucket, max_requests, window_seconds = self._limit_for(scope["path"], scope["method"])
+        decision = await self.limiter.acquire(f"{bucket}|{self._client_id(scope)}", max_requests, window_seconds)
+        if not decision.allowed:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded."},
+                status_code=429,
+                headers={"Retry-After": retry_after_header(decision.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        request.state.timestamp = datetime.now(UTC).timestamp()
-
-        if client_ip not in self.rate_limit:
-            self.rate_limit[client_ip] = []
-        
-        # Filtrar solicitudes dentro de la ventana de tiempo
-        self.rate_limit[client_ip] = [
-            timestamp for timestamp in self.rate_limit[client_ip]
-            if timestamp > request.state.timestamp - self.window_seconds
-        ]
-
-        if len(self.rate_limit[client_ip]) >= self.max_requests:
-            return JSONResponse({"detail": "Rate limit exceeded."}, status_code=429)
-
-        self.rate_limit[client_ip].append(request.state.timestamp)
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
@@ -2,11 +2,6 @@ import os, socket
 import consul
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from opentelemetry import trace
-from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from pydantic import BaseModel
 
@@ -62,16 +57,29 @@ async def health():
     return {"status": "ok"}
 
 # --- OpenTelemetry / Jaeger ---
-resource = Resource({SERVICE_NAME: "nfc-service"})
-provider = TracerProvider(resource=resource)
-jaeger_exporter = JaegerExporter(
-    agent_host_name=os.getenv("JAEGER_AGENT_HOST", "jaeger"),
-    agent_port=int(os.getenv("JAEGER_AGENT_PORT", 6831))
-)
-provider.add_span_processor(BatchSpanProcessor(jaeger_exporter))
-trace.set_tracer_provider(provider)
+# La instrumentación se engancha ya (usa el tracer global por proxy); el SDK y
+# el exportador de Jaeger (thrift) se cargan recién al arrancar, fuera del import.
+JAEGER_ENABLED = os.getenv("JAEGER_ENABLED", "true").lower() == "true"
 FastAPIInstrumentor().instrument_app(app)
 
+@app.on_event("startup")
+def setup_tracing():
+    if not JAEGER_ENABLED:
+        return
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+
+    provider = TracerProvider(resource=Resource({SERVICE_NAME: "nfc-service"}))
+    jaeger_exporter = JaegerExporter(
+        agent_host_name=os.getenv("JAEGER_AGENT_HOST", "jaeger"),
+        agent_port=int(os.getenv("JAEGER_AGENT_PORT", 6831))
+    )
+    provider.add_span_processor(BatchSpanProcessor(jaeger_exporter))
+    trace.set_tracer_provider(provider)
+
 # --- Registro en Consul ---
 SERVICE_ID = os.getenv("SERVICE_ID", "nfc-service-1")
 CONSUL_HOST = os.getenv("CONSUL_HOST", "consul")
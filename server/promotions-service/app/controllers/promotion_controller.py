@@ -5,9 +5,10 @@ from app.models.dtos.promotion_dto import PromotionDTO
 from app.services.promotion_service import PromotionService
 from app.utils.response_standardization import SuccessResponse, ErrorResponse, StandardResponse
 from app.services.auth_service import AuthService
+from app.utils.response_route import ModelResponseRoute
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
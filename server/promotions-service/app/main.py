@@ -1,35 +1,59 @@
 # main.py (Microservicio de promociones)
-from fastapi import FastAPI, Request, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 
 from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
+from app.middleware.compression_middleware import CompressionMiddleware, LIST_LEVELS
 from app.controllers.promotion_controller import router as promotion_router  # Importar el router de promociones
 from fastapi.exceptions import RequestValidationError
 from app.utils.exception_handlers import global_exception_dispatcher, request_validation_exception_handler
-from app.utils.consul_register import register_service_in_consul
+from app.utils.consul_client import ConsulRegistration
+from app.utils.firebase_config import init_firebase
+from app.utils.startup import StartupOrchestrator
+from app.services.auth_service import jwks_store, token_cache
+from app.repositories.promotion_repository import PromotionRepository
 
 #configuracion centralizada
-from .config_loader import fetch_config, PROFILE
+from .config_loader import fetch_config, PROFILE, on_config_change, start_config_watch
 
 cfg = fetch_config()
 # ahora vuelca cfg en variables de entorno o en tu pydantic BaseSettings
 HOST = cfg.get("host", "0.0.0.0")
 PORT = int(cfg.get("port", 8005))
 
+# Límites de tasa desde la configuración, recargables en caliente
+RateLimitMiddleware.configure(cfg)
+on_config_change(RateLimitMiddleware.configure)
+
+# Dependencias que se inicializan en paralelo al arrancar
+startup = StartupOrchestrator()
+startup.step("firebase", init_firebase)
+consul = ConsulRegistration("promotions-service", PORT)
+startup.step("consul", consul.register, required=False)
+
+# Calentamiento en segundo plano: /ready se pone verde recién al terminar
+startup.warmup("jwks", jwks_store.refresh)
+startup.warmup("promotions", PromotionRepository.get_all_promotions)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    register_service_in_consul("promotions-service", PORT)
+    start_config_watch()
+    await startup.run()
     yield
+    await startup.close()
+    await consul.deregister()
 
 app = FastAPI(
     title="Gestión de Promociones - Plataforma EzTo",
     description="Microservicio para la gestión de promociones dentro del sistema. "
                 ":)",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
     root_path="/promotions",
     contact={
@@ -58,33 +82,12 @@ app.add_middleware(
 # Middleware de Rate Limiting
 app.add_middleware(RateLimitMiddleware)
 
-# Middleware de GZIP para comprimir respuestas (mínimo 1KB)
-app.add_middleware(GZipMiddleware, minimum_size=1000)
-
-
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers.update({
-        "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",
-        "Content-Security-Policy": (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-            "img-src 'self' https://fastapi.tiangolo.com; "
-            "font-src 'self' https://cdnjs.cloudflare.com; "
-            "connect-src 'self'; "
-            "frame-ancestors 'self'; "
-            "form-action 'self'; "
-            "base-uri 'self';"
-        ),
-        "X-Content-Type-Options": "nosniff",
-        "X-Frame-Options": "DENY",
-        "X-XSS-Protection": "1; mode=block",
-        "Referrer-Policy": "strict-origin-when-cross-origin",
-        "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
-    })
-    return response
+# Compresión de respuestas (zstd, brotli o gzip según Accept-Encoding, mínimo 1KB)
+app.add_middleware(CompressionMiddleware, minimum_size=1000, routes={"/promotions": LIST_LEVELS})
+
+
+# Encabezados de seguridad
+app.add_middleware(SecurityHeadersMiddleware)
 
 
 # Middleware para restringir hosts permitidos
@@ -103,10 +106,27 @@ app.include_router(promotion_router, prefix="/promotions", tags=["Promociones"])
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics/rate-limit", tags=["Monitoreo"])
+def rate_limit_metrics():
+    return RateLimitMiddleware.metrics()
+
+@app.get("/metrics/compression", tags=["Monitoreo"])
+def compression_metrics():
+    return CompressionMiddleware.metrics()
+
+@app.get("/metrics/token-cache", tags=["Monitoreo"])
+def token_cache_metrics():
+    return token_cache.stats()
+
+@app.get("/ready", tags=["Monitoreo"])
+def readiness_check():
+    # 200 solo cuando las dependencias están inicializadas y el servicio ya calentó
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.status())
+
 @app.get("/config-health")
 def config_health():
     # Devuelve el profile y todo el cfg para inspección
-    return {"status": "up", "config_profile": PROFILE, "config": cfg}
+    return {"status": "up", "config_profile": PROFILE, "config": fetch_config()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -6,8 +6,9 @@ from pydantic import BaseModel, Field
 from app.services.sale_service import SaleService
 from app.services.auth_service import AuthService
 from app.models.purchase_model import SaleCreate, SaleResponse
+from app.utils.response_route import ModelResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Mensaje de error.")
@@ -5,14 +5,17 @@ import logging
 import requests
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.exceptions import RequestValidationError
 
+from app.middleware.compression_middleware import CompressionMiddleware, LIST_LEVELS
 from app.controllers.purchase_controller import router as purchase_router
-from app.utils.service_registry import register_service, deregister_service
+from app.utils.consul_client import ConsulRegistration
+from app.utils.firebase_config import init_firebase, open_channel
+from app.utils.startup import StartupOrchestrator
+from app.services.auth_service import jwks_store, token_cache
 
 # --- Logging ---
 logging.basicConfig(
@@ -22,16 +25,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # --- Configuración ---
-CONSUL_ADDR  = os.getenv("CONSUL_ADDR", "http://consul:8500")
 PORT         = int(os.getenv("PORT", 8002))
 SERVICE_NAME = "purchase-service"
-service_id: str | None = None
 
 # --- App FastAPI ---
 app = FastAPI(
     title="Purchase Service",
     description="Microservicio para gestión de ventas",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     openapi_tags=[{"name": "Compras"}]
 )
 
@@ -41,7 +43,7 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware, minimum_size=1000, routes={"/purchases": LIST_LEVELS})
 app.add_middleware(
     TrustedHostMiddleware,
     allowed_hosts=["*"]
@@ -66,20 +68,38 @@ app.include_router(purchase_router, prefix="/purchases", tags=["Compras"])
 async def health_check():
     return {"status": "ok", "service": SERVICE_NAME}
 
-# --- Startup / Shutdown para Consul ---
+@app.get("/ready", tags=["Monitoreo"])
+async def readiness_check():
+    # 200 solo cuando las dependencias están inicializadas y el servicio ya calentó
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.status())
+
+@app.get("/metrics/compression", tags=["Monitoreo"])
+async def compression_metrics():
+    return CompressionMiddleware.metrics()
+
+@app.get("/metrics/token-cache", tags=["Monitoreo"])
+async def token_cache_metrics():
+    return token_cache.stats()
+
+# --- Startup / Shutdown ---
+# Dependencias que se inicializan en paralelo al arrancar
+startup = StartupOrchestrator()
+startup.step("firebase", init_firebase)
+consul = ConsulRegistration(SERVICE_NAME, PORT)
+startup.step("consul", consul.register, required=False)
+
+# Calentamiento en segundo plano: /ready se pone verde recién al terminar
+startup.warmup("jwks", jwks_store.refresh)
+startup.warmup("firestore", lambda: open_channel("sales"))
+
 @app.on_event("startup")
 async def on_startup():
-    global service_id
-    service_id = register_service(
-        consul_addr=CONSUL_ADDR,
-        service_name=SERVICE_NAME,
-        service_port=PORT
-    )
+    await startup.run()
 
 @app.on_event("shutdown")
 async def on_shutdown():
-    if service_id:
-        deregister_service(CONSUL_ADDR, service_id)
+    await startup.close()
+    await consul.deregister()
 
 if __name__ == "__main__":
     import uvicorn
@@ -4,9 +4,10 @@ from app.models.dtos.reservation_dto import ReservationDTO
 from app.services.reservation_service import ReservationService
 from app.utils.response_standardization import SuccessResponse, StandardResponse
 from app.services.auth_service import AuthService
+from app.utils.response_route import ModelResponseRoute
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
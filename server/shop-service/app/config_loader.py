@@ -1,16 +1,233 @@
 # app/config_loader.py
 import os, httpx, yaml
+import logging
+import tempfile
+import threading
+import time
 
 CONFIG_URL = os.getenv("CONFIG_URL")
 APP_NAME   = os.getenv("APP_NAME")
 PROFILE    = os.getenv("APP_PROFILE","dev")
 AUTH       = (os.getenv("CFG_USER"), os.getenv("CFG_PWD"))
 
-def fetch_config() -> dict:
+# Última configuración buena, para arrancar aunque el Config-Server esté lento o caído
+CACHE_FILE = os.getenv(
+    "CONFIG_CACHE_FILE",
+    os.path.join(tempfile.gettempdir(), f"{APP_NAME}-{PROFILE}-config.yaml")
+)
+TIMEOUT            = float(os.getenv("CONFIG_TIMEOUT", 5))
+# Si hay copia local no se espera más que esto al arrancar
+FAST_TIMEOUT       = float(os.getenv("CONFIG_FAST_TIMEOUT", 2))
+REVALIDATE_SECONDS = float(os.getenv("CONFIG_REVALIDATE_SECONDS", 300))
+# Long-poll de cambios en caliente
+WATCH_ENABLED      = os.getenv("CONFIG_WATCH", "true").lower() == "true"
+WATCH_TIMEOUT      = float(os.getenv("CONFIG_WATCH_TIMEOUT", 30))
+
+logger = logging.getLogger(__name__)
+
+# Snapshot compartido por todos los módulos del proceso
+_snapshot: dict = None
+_fetched_at = 0.0
+_etag = None
+_lock = threading.Lock()
+_revalidating = threading.Event()
+_listeners: list = []
+_watch_thread: threading.Thread = None
+
+# Valores ya descifrados ({cipher} -> texto plano) y snapshot descifrado
+CIPHER_PREFIX = "{cipher}"
+_plain_values: dict = {}
+_decrypted: tuple = (None, None)
+
+def fetch_config(decrypt: bool = False) -> dict:
+    """
+    Devuelve la configuración del servicio. Solo la primera llamada del proceso
+    va al Config-Server; las demás reutilizan el mismo snapshot, que se
+    revalida en segundo plano cada `REVALIDATE_SECONDS`.
+
+    Con `decrypt=True` todos los valores `{cipher}…` vienen ya descifrados,
+    resueltos en una sola llamada a `/decrypt/batch`.
+    """
+    global _snapshot, _decrypted
+    if _snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                _snapshot = _load_initial()
+    elif time.monotonic() - _fetched_at > REVALIDATE_SECONDS:
+        _revalidate_in_background()
+
+    if not decrypt:
+        return _snapshot
+
+    snapshot = _snapshot
+    source, plain = _decrypted
+    if source is not snapshot:
+        plain = _resolve_ciphers(snapshot)
+        _decrypted = (snapshot, plain)
+    return plain
+
+def _fetch_remote(timeout: float) -> dict:
+    global _fetched_at
     url = f"{CONFIG_URL}/{APP_NAME}/{PROFILE}"
-    r   = httpx.get(url, auth=AUTH, timeout=5)
+    # Revalidación condicional: si nada cambió el Config-Server responde 304 sin cuerpo
+    headers = {"If-None-Match": _etag} if _etag and _snapshot is not None else {}
+    r   = httpx.get(url, auth=AUTH, timeout=timeout, headers=headers)
+    if r.status_code == 304:
+        _fetched_at = time.monotonic()
+        return _snapshot
+    r.raise_for_status()
+    return _apply_snapshot(r.text, r.headers.get("ETag"))
+
+def _apply_snapshot(text: str, etag: str) -> dict:
+    """
+    Reemplaza el snapshot de una sola vez (una asignación) y avisa a los
+    suscriptores de `on_config_change`.
+    """
+    global _snapshot, _fetched_at, _etag
+    cfg = yaml.safe_load(text)
+    previous = _snapshot
+    _snapshot = cfg
+    _fetched_at = time.monotonic()
+    _etag = etag
+    _write_cache(text)
+
+    if previous is not None and cfg != previous:
+        for callback in list(_listeners):
+            try:
+                callback(cfg)
+            except Exception:
+                logger.exception("Error aplicando la nueva configuración en %s", callback)
+    return cfg
+
+def on_config_change(callback):
+    """
+    Registra `callback(cfg)`, que se invoca con el nuevo snapshot cada vez que
+    la configuración cambia en caliente.
+    """
+    _listeners.append(callback)
+    return callback
+
+def start_config_watch():
+    """
+    Arranca (una sola vez) el hilo que hace long-poll a `/watch` del
+    Config-Server y aplica cada cambio sin reiniciar el servicio.
+    """
+    global _watch_thread
+    if not WATCH_ENABLED or (_watch_thread is not None and _watch_thread.is_alive()):
+        return
+
+    def run():
+        backoff = 1.0
+        while True:
+            try:
+                r = httpx.get(
+                    f"{CONFIG_URL}/watch/{APP_NAME}/{PROFILE}",
+                    params={"etag": _etag or "", "timeout": WATCH_TIMEOUT},
+                    auth=AUTH,
+                    timeout=WATCH_TIMEOUT + 10,
+                )
+                if r.status_code == 200:
+                    _apply_snapshot(r.text, r.headers.get("ETag"))
+                    logger.info("Configuración actualizada en caliente (%s)", _etag)
+                elif r.status_code != 304:
+                    r.raise_for_status()
+                backoff = 1.0
+            except Exception:
+                logger.warning("Watch de configuración falló, reintento en %.0f s", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    _watch_thread = threading.Thread(target=run, name="config-watch", daemon=True)
+    _watch_thread.start()
+
+def _load_initial() -> dict:
+    cached = _read_cache()
+    try:
+        return _fetch_remote(FAST_TIMEOUT if cached is not None else TIMEOUT)
+    except Exception:
+        if cached is None:
+            raise
+        logger.warning("Config-Server no disponible, arranco con la copia local %s", CACHE_FILE)
+        # _fetched_at queda en 0: la próxima lectura dispara una revalidación
+        return cached
+
+def _revalidate_in_background():
+    if _revalidating.is_set():
+        return
+    _revalidating.set()
+
+    def run():
+        try:
+            _fetch_remote(TIMEOUT)
+        except Exception:
+            logger.warning("No pude revalidar la configuración, sigo con el snapshot actual")
+        finally:
+            _revalidating.clear()
+
+    threading.Thread(target=run, name="config-revalidate", daemon=True).start()
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return yaml.safe_load(f.read())
+    except (OSError, yaml.YAMLError):
+        return None
+
+def _write_cache(text: str):
+    # Escritura atómica: nunca queda un archivo a medias
+    try:
+        tmp = f"{CACHE_FILE}.tmp"
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, CACHE_FILE)
+    except OSError:
+        logger.warning("No pude guardar la copia local de la configuración en %s", CACHE_FILE)
+
+def _collect_ciphers(data, found: list):
+    if isinstance(data, dict):
+        for v in data.values():
+            _collect_ciphers(v, found)
+    elif isinstance(data, list):
+        for v in data:
+            _collect_ciphers(v, found)
+    elif isinstance(data, str) and data.startswith(CIPHER_PREFIX):
+        found.append(data[len(CIPHER_PREFIX):])
+
+def _replace_ciphers(data):
+    if isinstance(data, dict):
+        return {k: _replace_ciphers(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_replace_ciphers(v) for v in data]
+    if isinstance(data, str) and data.startswith(CIPHER_PREFIX):
+        return _plain_values[data[len(CIPHER_PREFIX):]]
+    return data
+
+def _resolve_ciphers(data):
+    """
+    Copia de `data` con cada valor `{cipher}…` reemplazado por su texto plano.
+    """
+    found = []
+    _collect_ciphers(data, found)
+    pending = list(dict.fromkeys(c for c in found if c not in _plain_values))
+    if pending:
+        _plain_values.update(zip(pending, decrypt_values(pending)))
+    return _replace_ciphers(data)
+
+def decrypt_values(cipher_texts: list) -> list:
+    """
+    Descifra varios valores en una sola llamada a /decrypt/batch.
+    Si el Config-Server no expone ese endpoint, cae a /decrypt uno por uno.
+    """
+    r = httpx.post(
+        f"{CONFIG_URL}/decrypt/batch",
+        json={"ciphers": cipher_texts},
+        auth=AUTH,
+        timeout=TIMEOUT
+    )
+    if r.status_code in (404, 405):
+        return [decrypt_value(c) for c in cipher_texts]
     r.raise_for_status()
-    return yaml.safe_load(r.text)
+    return r.json()["plains"]
 
 def decrypt_value(cipher_text: str) -> str:
     """
@@ -24,4 +241,4 @@ def decrypt_value(cipher_text: str) -> str:
         timeout=5
     )
     r.raise_for_status()
-    return r.json()["plain"]
\ No newline at end of file
+    return r.json()["plain"]
@@ -12,8 +12,9 @@ import logging
 from app.models.product_model import ProductBase, ProductResponse
 from app.services.product_service import ProductService
 from app.services.auth_service import AuthService
+from app.utils.response_route import ModelResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
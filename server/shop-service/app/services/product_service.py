@@ -12,7 +12,6 @@ import io
 from datetime import date
 from typing import Optional
 from fastapi import UploadFile, HTTPException
-from PIL import Image
 
 from app.models.product_model import ProductBase, ProductResponse
 from app.repositories.product_repository import ProductRepository
@@ -47,6 +46,8 @@ class ProductService:
         # Procesar imagen
         image_base64 = None
         if product_image:
+            # PIL solo se carga cuando llega una imagen: no pesa en el arranque
+            from PIL import Image
             try:
                 content = await product_image.read()
                 image = Image.open(io.BytesIO(content)).convert("RGB")
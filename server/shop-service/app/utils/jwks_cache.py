@@ -0,0 +1,98 @@
+# app/utils/jwks_cache.py
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger("app.utils.jwks_cache")
+
+
+class JWKSKeyStore:
+    """
+    Almacén en memoria de las claves públicas (JWKS) del realm de Keycloak.
+
+    - El JWKS se descarga una sola vez y se reutiliza en todas las peticiones.
+    - Al vencer el TTL se siguen sirviendo las claves en caché y se refresca
+      en segundo plano.
+    - Solo se fuerza una descarga cuando llega un `kid` desconocido (rotación
+      de claves). Las descargas son single-flight y las forzadas respetan un
+      intervalo mínimo, así una rotación no dispara una ráfaga contra Keycloak.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl_seconds: float = 600,
+        min_refresh_interval: float = 10,
+        timeout: float = 5,
+    ):
+        self.jwks_url = jwks_url
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys: dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+
+    async def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """
+        Devuelve la clave JWK para `kid`, o None si Keycloak no la publica.
+        Lanza excepción solo si nunca se pudo descargar el JWKS.
+        """
+        if not self._keys:
+            await self.refresh()
+        elif self._is_stale():
+            self._schedule_background_refresh()
+
+        key = self._keys.get(kid)
+        if key is None and kid:
+            # kid desconocido: probablemente Keycloak rotó sus claves
+            await self.refresh(force=True)
+            key = self._keys.get(kid)
+        return key
+
+    async def refresh(self, force: bool = False) -> None:
+        generation = self._generation
+        async with self._lock:
+            # Single-flight: si otra corrutina completó una descarga mientras
+            # esperábamos el lock, reutilizamos su resultado (o su error).
+            if self._generation != generation:
+                if self._keys:
+                    return
+                raise RuntimeError("JWKS no disponible")
+            if force and time.monotonic() - self._last_attempt < self.min_refresh_interval:
+                return
+
+            self._last_attempt = time.monotonic()
+            try:
+                async with httpx.AsyncClient(timeout=self.timeout) as client:
+                    response = await client.get(self.jwks_url)
+                    response.raise_for_status()
+                    jwks = response.json()
+            except Exception:
+                self._generation += 1
+                if not self._keys:
+                    raise
+                logger.exception("No pude refrescar JWKS, sigo con las claves en caché")
+                return
+
+            self._keys = {k["kid"]: k for k in jwks.get("keys", []) if "kid" in k}
+            self._fetched_at = time.monotonic()
+            self._generation += 1
+            logger.info("JWKS actualizado: %d claves", len(self._keys))
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl_seconds
+
+    def _schedule_background_refresh(self) -> None:
+        if self._background is not None and not self._background.done():
+            return
+        if time.monotonic() - self._last_attempt < self.min_refresh_interval:
+            return
+        self._background = asyncio.get_running_loop().create_task(self.refresh())
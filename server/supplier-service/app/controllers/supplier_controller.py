@@ -14,8 +14,9 @@ from pydantic import BaseModel, Field
 from app.services.supplier_service import SupplierService
 from app.services.auth_service import AuthService
 from app.models.supplier_model import SupplierBase, SupplierResponse
+from app.utils.response_route import ModelResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 class ErrorResponse(BaseModel):
     """
@@ -128,7 +129,7 @@ from app.services.supplier_service import SupplierService
 from app.services.auth_service import AuthService
 from app.models.supplier_model import SupplierBase, SupplierResponse
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 
 class ErrorResponse(BaseModel):
     """
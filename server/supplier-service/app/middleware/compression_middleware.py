@@ -0,0 +1,262 @@
+# app/middleware/compression_middleware.py
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Niveles por defecto: rápidos, con mejor relación que gzip en brotli y zstd
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+# Listados JSON que se repiten idénticos: con la caché se comprimen una vez, así que vale más nivel
+LIST_LEVELS = {"zstd": 9, "br": 6, "gzip": 9}
+# Por debajo de esto comprimir es más barato que calcular la clave de la caché
+CACHE_MIN_SIZE = 8 * 1024
+# Cuerpos más grandes que esto se hashean y comprimen fuera del event loop (todo suelta el GIL)
+THREADPOOL_MIN_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+
+
+CODECS = {"gzip": lambda body, level: gzip.compress(body, compresslevel=level, mtime=0)}
+if brotli is not None:
+    CODECS["br"] = lambda body, level: brotli.compress(body, quality=level)
+if zstandard is not None:
+    # Un ZstdCompressor no se puede usar desde dos hilos a la vez: uno por llamada
+    CODECS["zstd"] = lambda body, level: zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def parse_accept_encoding(value: str) -> dict:
+    """`"br;q=1.0, gzip;q=0.8, *;q=0"` -> {"br": 1.0, "gzip": 0.8, "*": 0.0}"""
+    accepted = {}
+    for part in value.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate(accept_encoding: str, preference: list) -> Optional[str]:
+    """
+    Codificación a usar según `Accept-Encoding`: la de mayor q que el cliente
+    acepte; a igual q, la primera de `preference`. None si no acepta ninguna.
+    """
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_encoding(accept_encoding)
+    best, best_quality = None, 0.0
+    for coding in preference:
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressedBodyCache:
+    """
+    Cuerpos ya comprimidos, por (ETag, tamaño, codificación, nivel).
+
+    La ETag es la que puso la ruta o, si no puso ninguna, un hash del cuerpo
+    sin comprimir: dos respuestas idénticas de un listado comparten entrada y
+    se comprimen una sola vez. LRU acotado por cantidad de entradas y por
+    bytes totales.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = body
+        self.size += len(body)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def metrics(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CompressionMiddleware:
+    """
+    Compresión de respuestas con codificación negociada (zstd, brotli o gzip).
+
+    - Se elige la codificación según `Accept-Encoding` (q-values incluidos);
+      a igual preferencia del cliente gana el orden de `encodings`. brotli y
+      zstd se usan solo si su librería está instalada.
+    - `levels` fija el nivel por codificación y `routes` lo ajusta por
+      prefijo de ruta (el más largo gana), p. ej. niveles bajos donde viajan
+      imágenes en base64, que casi no ganan con más esfuerzo.
+    - Los cuerpos comprimidos se guardan en `cache`, compartido por todo el
+      proceso: un listado que se repite idéntico se comprime una sola vez.
+    - Solo se comprimen respuestas de un único mensaje (JSON, texto...) de
+      al menos `minimum_size` bytes; los streams pasan sin tocar.
+    """
+
+    cache = CompressedBodyCache()
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        encodings: tuple = ("zstd", "br", "gzip"),
+        levels: Optional[dict] = None,
+        routes: Optional[dict] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [e for e in encodings if e in CODECS]
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        # [(prefijo, niveles)], el prefijo más largo primero
+        self.routes = sorted(
+            ((prefix, {**self.levels, **route_levels}) for prefix, route_levels in (routes or {}).items()),
+            key=lambda r: len(r[0]),
+            reverse=True,
+        )
+
+    @classmethod
+    def metrics(cls) -> dict:
+        return {"encodings": list(CODECS), **cls.cache.metrics()}
+
+    def _levels_for(self, scope: Scope) -> dict:
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        # Detrás del gateway la ruta puede llegar con el prefijo del servicio (/class/classes/...)
+        if root_path and path.startswith(root_path + "/"):
+            path = path[len(root_path):]
+        for prefix, levels in self.routes:
+            if path.startswith(prefix):
+                return levels
+        return self.levels
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        level = self._levels_for(scope)[encoding]
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el cuerpo
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not self._compressible(headers.get("content-type", ""))
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = await self._compress(body, encoding, level, headers.get("etag"))
+            headers.add_vary_header("Accept-Encoding")
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                body = compressed
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(content_type: str) -> bool:
+        content_type = content_type.split(";", 1)[0].strip().lower()
+        return (
+            content_type.startswith("text/") and content_type != "text/event-stream"
+        ) or content_type in COMPRESSIBLE_TYPES or content_type.endswith("+json")
+
+    async def _compress(self, body: bytes, encoding: str, level: int, etag: Optional[str]) -> bytes:
+        codec = CODECS[encoding]
+        if len(body) < CACHE_MIN_SIZE:
+            return codec(body, level)
+
+        offload = len(body) >= THREADPOOL_MIN_SIZE
+        if etag is None:
+            etag = await run_in_threadpool(self.cache.etag_for, body) if offload else self.cache.etag_for(body)
+
+        key = (etag, len(body), encoding, level)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = await run_in_threadpool(codec, body, level) if offload else codec(body, level)
+            self.cache.put(key, compressed)
+        return compressed
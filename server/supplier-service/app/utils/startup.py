@@ -0,0 +1,94 @@
+# app/utils/startup.py
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+STEP_TIMEOUT = float(os.getenv("STARTUP_STEP_TIMEOUT", 20))
+
+
+class StartupOrchestrator:
+    """
+    Arranque del servicio dentro del lifespan, en dos fases.
+
+    1. Inicialización (`step`): Firebase, Keycloak, Consul… Los pasos corren
+       en paralelo, así el arranque en frío dura lo que el paso más lento y no
+       la suma de todos los handshakes. Si un paso obligatorio falla, `run()`
+       lanza y el servicio no arranca; un paso opcional solo queda registrado.
+    2. Calentamiento (`warmup`): JWKS, canal gRPC de Firestore, consultas más
+       usadas. Corre en segundo plano cuando el servicio ya acepta conexiones
+       (`/health` responde) y sus fallos no son fatales: la primera petición
+       haría ese trabajo de todos modos.
+
+    Las funciones síncronas van al threadpool. Cada paso se mide (`timings`,
+    en ms) y `ready` pasa a True solo al terminar el calentamiento: es lo que
+    expone `/ready` para que Traefik no mande tráfico a una réplica fría.
+    """
+
+    def __init__(self):
+        self._steps: list[tuple[str, Callable, bool]] = []
+        self._warmups: list[tuple[str, Callable]] = []
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.timings: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.ready = False
+
+    def step(self, name: str, fn: Callable, required: bool = True) -> None:
+        self._steps.append((name, fn, required))
+
+    def warmup(self, name: str, fn: Callable) -> None:
+        self._warmups.append((name, fn))
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._run_step(*s) for s in self._steps))
+        self.timings["init"] = _elapsed_ms(started)
+
+        failed = [name for (name, _, required), ok in zip(self._steps, results) if required and not ok]
+        if failed:
+            raise RuntimeError(f"Falló el arranque de: {', '.join(failed)}")
+
+        logger.info("Dependencias inicializadas en %.1f ms", self.timings["init"])
+        self._warmup_task = asyncio.get_running_loop().create_task(self._run_warmups())
+
+    async def _run_warmups(self) -> None:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run_step(name, fn, False) for name, fn in self._warmups))
+        self.timings["warmup"] = _elapsed_ms(started)
+        self.ready = True
+        logger.info("Servicio listo (calentamiento en %.1f ms): %s", self.timings["warmup"], self.timings)
+
+    async def _run_step(self, name: str, fn: Callable, required: bool) -> bool:
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(fn):
+                await asyncio.wait_for(fn(), STEP_TIMEOUT)
+            else:
+                await asyncio.wait_for(run_in_threadpool(fn), STEP_TIMEOUT)
+            return True
+        except Exception as e:
+            self.errors[name] = repr(e)
+            logger.log(
+                logging.ERROR if required else logging.WARNING,
+                "Paso de arranque '%s' falló: %r", name, e
+            )
+            return False
+        finally:
+            self.timings[name] = _elapsed_ms(started)
+
+    async def close(self) -> None:
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "timings_ms": self.timings, "errors": self.errors}
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -6,9 +6,10 @@ from app.models.dtos.UserMembershipDTO import UserMembershipDTO
 from app.services.usermembership_service import UserMembershipService
 from app.utils.response_standardization import SuccessResponse, StandardResponse
 from app.services.auth_service import AuthService
+from app.utils.response_route import ModelResponseRoute
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=ModelResponseRoute)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
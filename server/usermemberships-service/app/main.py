@@ -1,13 +1,20 @@
 # main.py (Microservicio de membresías activas)
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
-from app.utils.consul_register import register_service_in_consul
+from app.utils.consul_client import ConsulRegistration, discovery
+from app.services.promotion_validator_service import PROMOTION_SERVICE_NAME
+from functools import partial
+from app.utils.firebase_config import init_firebase, open_channel
+from app.utils.startup import StartupOrchestrator
+from app.services.auth_service import jwks_store, token_cache
 
 from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
+from app.middleware.compression_middleware import CompressionMiddleware
 
 # Controladores
 from app.controllers.usermembership_controller import router as user_membership_router
@@ -15,22 +22,42 @@ from app.controllers.usermembership_controller import router as user_membership_
 # Manejo de errores
 from app.utils.exception_handlers import global_exception_dispatcher, request_validation_exception_handler
 
-from .config_loader import fetch_config, PROFILE
+from .config_loader import fetch_config, PROFILE, on_config_change, start_config_watch
 
 cfg = fetch_config()
 # ahora vuelca cfg en variables de entorno o en tu pydantic BaseSettings
 HOST = cfg.get("host", "0.0.0.0")
 PORT = int(cfg.get("port", 8006))
 
+# Límites de tasa desde la configuración, recargables en caliente
+RateLimitMiddleware.configure(cfg)
+on_config_change(RateLimitMiddleware.configure)
+
+
+# Dependencias que se inicializan en paralelo al arrancar
+startup = StartupOrchestrator()
+startup.step("firebase", init_firebase)
+consul = ConsulRegistration("usermembership-service", PORT)
+startup.step("consul", consul.register, required=False)
+
+# Calentamiento en segundo plano: /ready se pone verde recién al terminar
+startup.warmup("jwks", jwks_store.refresh)
+startup.warmup("discovery", partial(discovery.instances, PROMOTION_SERVICE_NAME))
+startup.warmup("firestore", lambda: open_channel("user_memberships"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    register_service_in_consul("usermembership-service", 8006)
+    start_config_watch()
+    await startup.run()
     yield
+    await startup.close()
+    await consul.deregister()
+    await discovery.close()
 app = FastAPI(
     title="Gestión de Membresías Activas - Plataforma EzTo",
     description="Microservicio para la gestión de membresías activas de los usuarios dentro del sistema EzTo.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
     root_path="/usermemberships",
     contact={
@@ -57,34 +84,12 @@ app.add_middleware(
 )
 
 # 📈 GZIP para comprimir respuestas
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
 # 🔒 Autenticación y rate limiting
 app.add_middleware(RateLimitMiddleware)
 
 # 🛡️ Seguridad de cabeceras
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers.update({
-        "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",
-        "Content-Security-Policy": (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; "
-            "img-src 'self' https://fastapi.tiangolo.com; "
-            "font-src 'self' https://cdnjs.cloudflare.com; "
-            "connect-src 'self'; "
-            "frame-ancestors 'self'; "
-            "form-action 'self'; "
-            "base-uri 'self';"
-        ),
-        "X-Content-Type-Options": "nosniff",
-        "X-Frame-Options": "DENY",
-        "X-XSS-Protection": "1; mode=block",
-        "Referrer-Policy": "strict-origin-when-cross-origin",
-        "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
-    })
-    return response
+app.add_middleware(SecurityHeadersMiddleware)
 
 # 🌍 Restricción de hosts
 app.add_middleware(
@@ -101,11 +106,28 @@ app.include_router(user_membership_router, prefix="/usermemberships", tags=["Mem
 @app.get("/health", tags=["Monitoreo"])
 def health_check():
     return {"status": "ok"}
+
+@app.get("/metrics/rate-limit", tags=["Monitoreo"])
+def rate_limit_metrics():
+    return RateLimitMiddleware.metrics()
+
+@app.get("/metrics/compression", tags=["Monitoreo"])
+def compression_metrics():
+    return CompressionMiddleware.metrics()
+
+@app.get("/metrics/token-cache", tags=["Monitoreo"])
+def token_cache_metrics():
+    return token_cache.stats()
+
+@app.get("/ready", tags=["Monitoreo"])
+def readiness_check():
+    # 200 solo cuando las dependencias están inicializadas y el servicio ya calentó
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.status())
 # 📌 Rutas del microservicio
 
 @app.get("/config-health")
 def config_health():
     # Devuelve el profile y todo el cfg para inspección
-    return {"status": "up", "config_profile": PROFILE, "config": cfg}
+    return {"status": "up", "config_profile": PROFILE, "config": fetch_config()}
 
 
@@ -1,12 +1,14 @@
 import logging
 from datetime import date
-from httpx import AsyncClient
 import os
 from app.utils.promotion_math import apply_promotion_to_price
+from app.utils.consul_client import discovery
 
 logger = logging.getLogger(__name__)
 
-PROMOTION_SERVICE_URL = os.getenv("PROMOTIONS_SERVICE_HOST", "http://promotions-service:8000") + "/promotions"
+# Las instancias sanas salen de Consul; la URL fija queda solo como respaldo
+PROMOTION_SERVICE_NAME = os.getenv("PROMOTIONS_SERVICE_NAME", "promotions-service")
+PROMOTION_SERVICE_FALLBACK = os.getenv("PROMOTIONS_SERVICE_HOST", "http://promotions-service:8000")
 
 class PromotionValidatorService:
 
@@ -22,47 +24,50 @@ class PromotionValidatorService:
         :return: Diccionario con {valid, final_price, promotion_data, message}
         """
         try:
-            async with AsyncClient() as client:
-                url = f"{PROMOTION_SERVICE_URL}/{promotion_id}"
-                response = await client.get(url)
-                if response.status_code != 200:
-                    return {
-                        "valid": False,
-                        "message": "Promoción no encontrada o inaccesible"
-                    }
-
-                promo = response.json().get("data") or response.json()
-                
-                # 🔍 Validar fechas
-                start_date = date.fromisoformat(promo["start_date"])
-                end_date = date.fromisoformat(promo["end_date"])
-                if not (start_date <= today <= end_date):
-                    return {
-                        "valid": False,
-                        "message": "La promoción no está activa en esta fecha"
-                    }
-
-                # 🔍 Validar tipo de usuario
-                if promo["applicable_to"] != "all_users" and promo["applicable_to"] != user_type:
-                    return {
-                        "valid": False,
-                        "message": f"La promoción no aplica a usuarios de tipo '{user_type}'"
-                    }
+            response = await discovery.request(
+                PROMOTION_SERVICE_NAME,
+                "GET",
+                f"/promotions/{promotion_id}",
+                fallback=PROMOTION_SERVICE_FALLBACK,
+            )
+            if response.status_code != 200:
+                return {
+                    "valid": False,
+                    "message": "Promoción no encontrada o inaccesible"
+                }
 
-                # ✅ Calcular precio final
-                final_price = apply_promotion_to_price(
-                    price=plan_price,
-                    discount_type=promo["discount_type"],
-                    discount_value=promo["discount_value"]
-                )
+            promo = response.json().get("data") or response.json()
+            
+            # 🔍 Validar fechas
+            start_date = date.fromisoformat(promo["start_date"])
+            end_date = date.fromisoformat(promo["end_date"])
+            if not (start_date <= today <= end_date):
+                return {
+                    "valid": False,
+                    "message": "La promoción no está activa en esta fecha"
+                }
 
+            # 🔍 Validar tipo de usuario
+            if promo["applicable_to"] != "all_users" and promo["applicable_to"] != user_type:
                 return {
-                    "valid": True,
-                    "final_price": final_price,
-                    "promotion_data": promo,
-                    "message": "Promoción válida"
+                    "valid": False,
+                    "message": f"La promoción no aplica a usuarios de tipo '{user_type}'"
                 }
 
+            # ✅ Calcular precio final
+            final_price = apply_promotion_to_price(
+                price=plan_price,
+                discount_type=promo["discount_type"],
+                discount_value=promo["discount_value"]
+            )
+
+            return {
+                "valid": True,
+                "final_price": final_price,
+                "promotion_data": promo,
+                "message": "Promoción válida"
+            }
+
         except Exception as e:
             logger.error(f"❌ Error al validar promoción desde promotions-service: {e}")
             return {
@@ -0,0 +1,71 @@
+# app/utils/response_route.py
+import asyncio
+import functools
+from typing import Any, Callable, Optional, get_args, get_origin
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+
+def _instance_check(annotation: Any) -> Optional[Callable[[Any], bool]]:
+    # Solo `Modelo` y `List[Modelo]`: lo que devuelven nuestros endpoints
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: isinstance(value, annotation)
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation) or (None,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return lambda value: isinstance(value, list) and all(isinstance(v, item) for v in value)
+    return None
+
+
+class ModelResponseRoute(APIRoute):
+    """
+    Ruta con camino rápido para `response_model`.
+
+    Si el endpoint devuelve instancias del modelo declarado (o una lista de
+    ellas), esos datos ya se validaron al construirlas: se serializan con el
+    serializador del modelo y se arma la respuesta ahí mismo, sin la pasada
+    de validación de FastAPI contra `response_model`. Cualquier otro valor
+    (dicts, None, otro modelo) sigue el camino normal de FastAPI. Se
+    respetan `status_code`, `response_class` y las opciones
+    `response_model_*` de la ruta.
+    """
+
+    def get_route_handler(self):
+        accepts = _instance_check(self.response_model)
+        # Si el endpoint recibe `response: Response` (cookies, headers) se deja el camino normal
+        if accepts is not None and self.dependant.response_param_name is None:
+            self.dependant.call = self._fast_path(self.dependant.call, accepts)
+        return super().get_route_handler()
+
+    def _fast_path(self, call: Callable, accepts: Callable[[Any], bool]) -> Callable:
+        adapter = TypeAdapter(self.response_model)
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        options = {
+            "include": self.response_model_include,
+            "exclude": self.response_model_exclude,
+            "by_alias": self.response_model_by_alias,
+            "exclude_unset": self.response_model_exclude_unset,
+            "exclude_defaults": self.response_model_exclude_defaults,
+            "exclude_none": self.response_model_exclude_none,
+        }
+        status_code = self.status_code or 200
+
+        def respond(result):
+            if not accepts(result):
+                return result
+            content = adapter.dump_python(result, mode="json", **options)
+            return response_class(content=content, status_code=status_code)
+
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def endpoint(**kwargs):
+                return respond(await call(**kwargs))
+        else:
+            @functools.wraps(call)
+            def endpoint(**kwargs):
+                return respond(call(**kwargs))
+        return endpoint